@@ -0,0 +1,271 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.shared import SharedBloomFilter
+from reviews.constants import (
+    ADMIN,
+    MODERATOR,
+    TOKEN_BLOOM_HASHES,
+    TOKEN_BLOOM_SIZE,
+    TOKEN_CACHE_SIZE,
+)
+
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Токен с именем, ролью и версией токенов пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class ClaimsUser(SimpleLazyObject):
+    """Пользователь, собранный из утверждений токена.
+
+    Для проверки прав хватает утверждений токена, строка пользователя
+    загружается из базы только при обращении к остальным полям. Роли
+    модератора и администратора перед использованием сверяются с базой,
+    поэтому понижение роли действует сразу.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, load_user):
+        self.__dict__['token'] = token
+        super().__init__(load_user)
+
+    @property
+    def id(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    pk = id
+
+    @property
+    def username(self):
+        return self.token['username']
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_superuser(self):
+        return self.get_verified('is_superuser')
+
+    @property
+    def is_admin(self):
+        return self.get_verified('is_admin')
+
+    @property
+    def is_moderator(self):
+        return self.get_verified('is_moderator')
+
+    def get_verified(self, name):
+        """Привилегия из токена, подтверждённая строкой пользователя."""
+
+        if self.role not in (ADMIN, MODERATOR) and not (
+            self.token['is_superuser']
+        ):
+            return False
+        if self._wrapped is empty:
+            self._setup()
+        return getattr(self._wrapped, name)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе.
+
+    Для токенов с утверждениями из ClaimsRefreshToken возвращает
+    ClaimsUser, строка пользователя загружается лениво. Токены без
+    утверждений обрабатываются как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return self.get_verified_user(validated_token)
+        return ClaimsUser(
+            validated_token, lambda: self.get_verified_user(validated_token)
+        )
+
+    def get_verified_user(self, validated_token):
+        """Пользователь из базы с проверкой версии токена."""
+
+        user = super().get_user(validated_token)
+        if user.token_version != validated_token.get(
+            TOKEN_VERSION_CLAIM, user.token_version
+        ):
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен.',
+                code='token_version_changed'
+            )
+        return user
+
+
+class TokenCache:
+    """Ограниченный LRU-кеш со сроком жизни записей.
+
+    Записи привязаны к пользователю, чтобы их можно было сбросить
+    при изменении или удалении пользователя.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._user_keys = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, expires_at, user_id):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, expires_at, user_id)
+            self._user_keys[user_id].add(key)
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in tuple(self._user_keys.get(user_id, ())):
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = self.misses = 0
+
+    def _pop(self, key):
+        _, _, user_id = self._entries.pop(key)
+        keys = self._user_keys[user_id]
+        keys.discard(key)
+        if not keys:
+            del self._user_keys[user_id]
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+# Фильтр создаётся при первом обращении, поэтому путь к файлу
+# можно переопределить в настройках до начала работы.
+# Отзыв нужен, только пока живы отозванные токены, поэтому поколения
+# фильтра сменяются с периодом ACCESS_TOKEN_LIFETIME.
+revoked_tokens = SimpleLazyObject(lambda: SharedBloomFilter(
+    settings.TOKEN_REVOCATION_FILE,
+    TOKEN_BLOOM_SIZE,
+    TOKEN_BLOOM_HASHES,
+    api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+))
+
+
+def get_revocation_key(user_id, token_version):
+    return f'{user_id}:{token_version}'
+
+
+def revoke_user_tokens(user, token_version=None):
+    """Отозвать токены пользователя с версией `token_version`.
+
+    По умолчанию отзываются токены текущей версии. Отзыв виден всем
+    процессам сервера через revoked_tokens, локальный кеш токенов
+    сбрасывается сразу.
+    """
+
+    if token_version is None:
+        token_version = user.token_version
+    revoked_tokens.add(get_revocation_key(user.pk, token_version))
+    token_cache.invalidate_user(user.pk)
+
+
+def invalidate_user_tokens(user):
+    """Сбросить кеш токенов изменённого пользователя.
+
+    Если при сохранении версия токенов сменилась, токены прежней версии
+    отзываются.
+    """
+
+    if getattr(user, 'token_version_changed', False):
+        revoke_user_tokens(user, user.token_version - 1)
+    else:
+        token_cache.invalidate_user(user.pk)
+
+
+class CachedClaimsJWTAuthentication(ClaimsJWTAuthentication):
+    """ClaimsJWTAuthentication с кешем проверенных токенов.
+
+    Проверенный токен и загруженный по нему пользователь хранятся
+    в token_cache до истечения срока действия токена, поэтому повторные
+    запросы с тем же токеном не проверяют подпись заново.
+
+    Перед использованием токен сверяется со списком отозванных
+    revoked_tokens. Отрицательный ответ фильтра Блума точен и не требует
+    обращений к базе; при положительном пользователь загружается из базы
+    в обход кеша и версия токена проверяется по ней.
+    """
+
+    def get_user(self, validated_token):
+        if self.may_be_revoked(validated_token):
+            return self.get_verified_user(validated_token)
+        return super().get_user(validated_token)
+
+    def may_be_revoked(self, validated_token):
+        return get_revocation_key(
+            validated_token.get(api_settings.USER_ID_CLAIM),
+            validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        ) in revoked_tokens
+
+    def get_validated_token(self, raw_token):
+        key = ('token', hashlib.sha256(raw_token).hexdigest())
+        validated_token = token_cache.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(
+                key,
+                validated_token,
+                validated_token['exp'],
+                validated_token.get(api_settings.USER_ID_CLAIM)
+            )
+        return validated_token
+
+    def get_verified_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        key = ('user', user_id, validated_token.get(TOKEN_VERSION_CLAIM))
+        user = None
+        if not self.may_be_revoked(validated_token):
+            user = token_cache.get(key)
+        if user is None:
+            user = super().get_verified_user(validated_token)
+            token_cache.set(key, user, validated_token['exp'], user_id)
+        return copy.copy(user)
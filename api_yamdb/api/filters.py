@@ -1,11 +1,31 @@
+from collections import Counter
+
 import django_filters
+from django.db.models import Count
+from rest_framework import serializers
 
+from reviews.constants import YEAR_FACET_STEP
 from reviews.models import Title
 
 
+TITLE_FACETS = ('genre', 'category', 'year')
+
+GENRE_MATCH_ANY = 'any'
+GENRE_MATCH_ALL = 'all'
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по списку значений, перечисленных через запятую."""
+
+
 class TitleFilter(django_filters.FilterSet):
-    genre = django_filters.CharFilter(
-        field_name='genres__slug', lookup_expr='exact'
+    genre = CharInFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=(
+            (GENRE_MATCH_ANY, 'Любой из жанров'),
+            (GENRE_MATCH_ALL, 'Все жанры'),
+        ),
+        method='filter_genre_match',
     )
     category = django_filters.CharFilter(
         field_name='category__slug', lookup_expr='exact'
@@ -13,7 +33,80 @@ class TitleFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(
         field_name='name', lookup_expr='icontains'
     )
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
+    )
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
+    )
+    rating_min = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='gte'
+    )
+    rating_max = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='lte'
+    )
 
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+    def filter_genre(self, queryset, name, value):
+        """Отбор по жанрам через подзапрос к таблице связей.
+
+        Подзапрос идёт по индексам таблицы title_genres и не размножает
+        строки произведений, поэтому DISTINCT не нужен.
+        """
+
+        slugs = set(value)
+        links = Title.genres.through.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_match') == GENRE_MATCH_ALL:
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+
+def parse_facets(value):
+    """Разбор параметра `facets` в кортеж запрошенных фасетов."""
+
+    facets = tuple(facet for facet in value.split(',') if facet)
+    unknown = set(facets) - set(TITLE_FACETS)
+    if unknown:
+        raise serializers.ValidationError(
+            {'facets': [
+                f'Неизвестные фасеты: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(TITLE_FACETS)}.'
+            ]}
+        )
+    return facets or TITLE_FACETS
+
+
+def get_title_facets(queryset, facets=TITLE_FACETS):
+    """Подсчёт фасетов по жанрам, категориям и годам за один запрос.
+
+    Строки join с жанрами читаются одним проходом: жанры считаются
+    по каждой строке, категория и десятилетие — один раз на произведение.
+    """
+
+    counters = {facet: Counter() for facet in facets}
+    seen = set()
+    rows = Title.objects.filter(
+        pk__in=queryset.values('pk')
+    ).values_list('pk', 'category__slug', 'year', 'genres__slug')
+    for pk, category, year, genre in rows:
+        if genre and 'genre' in counters:
+            counters['genre'][genre] += 1
+        if pk in seen:
+            continue
+        seen.add(pk)
+        if 'category' in counters:
+            counters['category'][category] += 1
+        if 'year' in counters:
+            counters['year'][year // YEAR_FACET_STEP * YEAR_FACET_STEP] += 1
+    return {
+        facet: dict(sorted(counter.items()))
+        for facet, counter in counters.items()
+    }
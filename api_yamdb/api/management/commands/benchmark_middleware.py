@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+from reviews.constants import (
+    BENCHMARK_PATH,
+    BENCHMARK_REPEAT,
+    BENCHMARK_REQUESTS,
+)
+
+DEFAULT_MIDDLEWARE = (
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+)
+
+
+class Command(BaseCommand):
+    """Замер накладных расходов middleware на запрос."""
+
+    help = (
+        'Прогоняет GET-запросы через обработчик Django без middleware, '
+        'со стандартным набором middleware и с набором из настроек и '
+        'выводит время на запрос и накладные расходы middleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=BENCHMARK_PATH,
+            help='Путь, на который отправляются запросы.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=BENCHMARK_REQUESTS,
+            help='Количество запросов в одном замере.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=BENCHMARK_REPEAT,
+            help='Количество замеров, берётся лучший.'
+        )
+
+    def handle(self, *args, **options):
+        stacks = {
+            'без middleware': (),
+            'стандартный набор': DEFAULT_MIDDLEWARE,
+            'MIDDLEWARE из настроек': settings.MIDDLEWARE,
+        }
+        handlers = {
+            name: self.get_handler(middleware)
+            for name, middleware in stacks.items()
+        }
+        timings = dict.fromkeys(handlers, float('inf'))
+        for _ in range(options['repeat']):
+            for name, handler in handlers.items():
+                timings[name] = min(timings[name], self.measure(
+                    handler, options['path'], options['requests']
+                ))
+        baseline = timings['без middleware']
+        for name, seconds in timings.items():
+            self.stdout.write(
+                f'{name}: {seconds * 1e6:.1f} мкс на запрос, '
+                f'middleware: {(seconds - baseline) * 1e6:.1f} мкс'
+            )
+
+    def get_handler(self, middleware):
+        with override_settings(MIDDLEWARE=list(middleware)):
+            handler = BaseHandler()
+            handler.load_middleware()
+        return handler
+
+    def measure(self, handler, path, requests):
+        """Среднее время обработки одного запроса в секундах."""
+
+        factory = RequestFactory()
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = handler.get_response(factory.get(path))
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{path} ответил со статусом {response.status_code}.'
+                )
+        return (time.perf_counter() - start) / requests
@@ -0,0 +1,159 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand, CommandError
+
+from reviews.constants import (
+    BENCHMARK_CLIENT_DELAY,
+    BENCHMARK_CONCURRENCY,
+    BENCHMARK_PATH,
+    BENCHMARK_REQUESTS,
+    BENCHMARK_THREADS,
+)
+
+WSGI = 'wsgi'
+ASGI = 'asgi'
+
+
+class Command(BaseCommand):
+    """Сравнение пропускной способности WSGI и ASGI."""
+
+    help = (
+        'Прогоняет GET-запросы через обработчик WSGI в пуле потоков или '
+        'через обработчик ASGI в одном цикле событий. Каждый клиент '
+        'читает ответ с задержкой --client-delay, как медленное '
+        'соединение, и занимает на это время поток WSGI. Асинхронные '
+        'представления включаются переменной окружения '
+        'ASYNC_READ_VIEWS=True, как в asgi.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server', choices=(WSGI, ASGI), default=WSGI,
+            help='Какой обработчик Django нагружать.'
+        )
+        parser.add_argument(
+            '--path', default=BENCHMARK_PATH,
+            help='Путь, на который отправляются запросы.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=BENCHMARK_REQUESTS,
+            help='Общее количество запросов.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=BENCHMARK_CONCURRENCY,
+            help='Количество одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=BENCHMARK_THREADS,
+            help='Размер пула потоков WSGI.'
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=BENCHMARK_CLIENT_DELAY,
+            help='Сколько секунд клиент читает ответ.'
+        )
+
+    def handle(self, *args, **options):
+        path, query = urlsplit(options['path'])[2:4]
+        run = self.run_wsgi if options['server'] == WSGI else self.run_asgi
+        start = time.perf_counter()
+        statuses = run(path, query, options)
+        elapsed = time.perf_counter() - start
+        failed = [status for status in statuses if status >= 400]
+        if failed:
+            raise CommandError(
+                f'{len(failed)} запросов завершились ошибкой, '
+                f'например со статусом {failed[0]}.'
+            )
+        views = (
+            'асинхронные' if settings.ASYNC_READ_VIEWS else 'синхронные'
+        )
+        self.stdout.write(
+            f'{options["server"].upper()}, {views} представления: '
+            f'{len(statuses) / elapsed:.1f} запросов в секунду, '
+            f'{elapsed:.2f} с на {len(statuses)} запросов.'
+        )
+
+    def run_wsgi(self, path, query, options):
+        handler = WSGIHandler()
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+        }
+
+        def request():
+            statuses = []
+            response = handler(
+                {**environ, 'wsgi.input': io.BytesIO()},
+                lambda status, headers: statuses.append(int(status[:3]))
+            )
+            try:
+                for _ in response:
+                    time.sleep(options['client_delay'])
+            finally:
+                response.close()
+            return statuses[0]
+
+        threads = min(options['threads'], options['concurrency'])
+        with ThreadPoolExecutor(threads) as executor:
+            futures = [
+                executor.submit(request) for _ in range(options['requests'])
+            ]
+            return [future.result() for future in futures]
+
+    def run_asgi(self, path, query, options):
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+
+        async def request(semaphore):
+            statuses = []
+            received = asyncio.Event()
+
+            async def receive():
+                if received.is_set():
+                    await asyncio.Future()
+                received.set()
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                else:
+                    await asyncio.sleep(options['client_delay'])
+
+            async with semaphore:
+                await handler(dict(scope), receive, send)
+            return statuses[0]
+
+        async def main():
+            semaphore = asyncio.Semaphore(options['concurrency'])
+            return await asyncio.gather(
+                *(request(semaphore) for _ in range(options['requests']))
+            )
+
+        return asyncio.run(main())
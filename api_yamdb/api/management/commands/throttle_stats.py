@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+from rest_framework.settings import api_settings
+
+from api import throttling
+
+
+class Command(BaseCommand):
+    """Вывод количества отклонённых ограничениями запросов."""
+
+    help = (
+        'Выводит для каждой области из DEFAULT_THROTTLE_RATES, сколько '
+        'запросов отклонили ограничения во всех процессах сервера с '
+        'момента создания файла счётчиков.'
+    )
+
+    def handle(self, *args, **options):
+        for scope in sorted(api_settings.DEFAULT_THROTTLE_RATES):
+            self.stdout.write(
+                f'{scope}: {throttling.rejections.get(scope)}'
+            )
@@ -0,0 +1,209 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.shortcuts import aget_object_or_404
+from django.utils.decorators import classonlymethod
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в сериализаторе только поля из контекста `fields`.
+
+    Поля из `Meta.optional_fields` выводятся, только если они явно
+    перечислены в `fields`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'fields' not in self.context:
+            return
+        fields = self.context['fields'] or set(self.fields) - set(
+            getattr(self.Meta, 'optional_fields', ())
+        )
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+
+class SparseFieldsViewSetMixin:
+    """Поддержка параметра `?fields=` для чтения.
+
+    Кроме полей ответа сокращается и запрос к базе: лишние колонки
+    откладываются через `only()`, а ненужные связи не подгружаются.
+    """
+
+    sparse_fields_param = 'fields'
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.sparse_fields_param)
+        if not value:
+            return None
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = set(fields) - set(self.get_serializer_class()().fields)
+        if unknown:
+            raise serializers.ValidationError({
+                self.sparse_fields_param: [
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if not fields:
+            return queryset
+        return self.prune_queryset(queryset, fields)
+
+    def get_sparse_sources(self, queryset, fields):
+        """Колонки и связи модели, нужные для вывода полей `fields`.
+
+        Возвращает None, если зависимости поля определить нельзя.
+        """
+
+        model = queryset.model
+        serializer_fields = self.get_serializer_class()().fields
+        columns = {model._meta.pk.name}
+        relations = set()
+        for name in fields:
+            source = serializer_fields[name].source
+            if source == '*':
+                return None
+            root = source.split('.')[0]
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                if root in queryset.query.annotations:
+                    continue
+                return None
+            if model_field.many_to_many or model_field.one_to_many:
+                relations.add(root)
+                continue
+            columns.add(root)
+            if model_field.is_relation:
+                relations.add(root)
+        return columns, relations
+
+    def prune_queryset(self, queryset, fields):
+        sources = self.get_sparse_sources(queryset, fields)
+        select_related = queryset.query.select_related
+        if sources is None or select_related is True:
+            return queryset
+        columns, relations = sources
+        if select_related:
+            queryset = queryset.select_related(None)
+            kept = [name for name in select_related if name in relations]
+            if kept:
+                queryset = queryset.select_related(*kept)
+        prefetch_lookups = queryset._prefetch_related_lookups
+        if prefetch_lookups:
+            queryset = queryset.prefetch_related(None).prefetch_related(*(
+                lookup for lookup in prefetch_lookups
+                if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+                in relations
+            ))
+        return queryset.only(*columns)
+
+
+class AsyncReadViewSetMixin:
+    """Асинхронные list и retrieve для работы под ASGI.
+
+    При ASYNC_READ_VIEWS GET-запросы к действиям из `async_actions`
+    обрабатываются корутинами `a<действие>`, которые ходят в базу через
+    асинхронный ORM. Остальные запросы выполняет синхронное
+    представление в отдельном потоке.
+    """
+
+    async_actions = ('list', 'retrieve')
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if action not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            return await self.adispatch(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Асинхронный аналог APIView.dispatch."""
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def aget_queryset(self):
+        """Асинхронный аналог get_queryset.
+
+        Переопределяется, если для построения запроса нужны объекты
+        из базы: их следует загрузить здесь через асинхронный ORM.
+        """
+
+        return self.get_queryset()
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, view=self
+            )
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(
+            [obj async for obj in queryset], many=True
+        )
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
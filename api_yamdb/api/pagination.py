@@ -0,0 +1,31 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination с асинхронным разбиением на страницы."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный аналог paginate_queryset.
+
+        Количество объектов и страница загружаются через асинхронный ORM,
+        поэтому представление не блокирует цикл событий.
+        """
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return [obj async for obj in self.page.object_list]
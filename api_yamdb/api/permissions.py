@@ -6,6 +6,13 @@ class IsAdmin(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+class IsModeratorOrAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_moderator or request.user.is_admin
+        )
+
+
 class IsAuthorOrModeratorOrAdminOrReadOnly(permissions.BasePermission):
 
     def has_permission(self, request, view):
@@ -17,7 +24,7 @@ class IsAuthorOrModeratorOrAdminOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_moderator
             or request.user.is_admin
         )
@@ -1,18 +1,31 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from api.authentication import ClaimsRefreshToken
+from api.mixins import SparseFieldsSerializerMixin
 from api.utils import generate_confirmation_code, send_code_email
 from api.validations import UsernameValidationMixin
-from reviews.constants import MAX_EMAIL_LENGTH, MAX_NAME_LENGTH
+from reviews.constants import (
+    BATCH_MAX_REQUESTS,
+    MAX_EMAIL_LENGTH,
+    MAX_NAME_LENGTH,
+    MIN_REVIEW_SCORE,
+    MODERATION_BULK_LIMIT,
+)
 from reviews.models import Category, Comment, Genre, Review, Title
 
 
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для модели категории без поля id."""
 
     class Meta:
@@ -20,7 +33,10 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для модели жанра."""
 
     class Meta:
@@ -28,14 +44,66 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Поле slug, берущее объекты из `slug_objects` в контексте.
+
+    Для пакетной загрузки объекты по всем slug запрашиваются заранее,
+    и валидация элементов не делает отдельных запросов к базе.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('slug_objects', {}).get(
+            self.queryset.model
+        )
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[data]
+        except KeyError:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        except TypeError:
+            self.fail('invalid')
+
+
+class ScoreCountsField(serializers.ReadOnlyField):
+    """Счётчики оценок произведения в виде словаря оценка: количество."""
+
+    def to_representation(self, value):
+        return dict(enumerate(value, MIN_REVIEW_SCORE))
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Пакетное создание произведений."""
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            titles = Title.objects.bulk_create(
+                Title(**{
+                    field: value for field, value in item.items()
+                    if field != 'genres'
+                })
+                for item in validated_data
+            )
+            Title.genres.through.objects.bulk_create(
+                Title.genres.through(title_id=title.pk, genre_id=genre.pk)
+                for title, item in zip(titles, validated_data)
+                for genre in dict.fromkeys(item['genres'])
+            )
+        return titles
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для модели произведения."""
 
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         many=True,
         slug_field='slug',
         queryset=Genre.objects.all(),
@@ -52,6 +120,7 @@ class TitleSerializer(serializers.ModelSerializer):
             'genre',
             'category',
         )
+        list_serializer_class = TitleListSerializer
 
     def validate_genre(self, value):
         if not value:
@@ -64,12 +133,16 @@ class TitleSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(instance, context=self.context).data
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для модели произведения c категорией без поля id."""
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True, source='genres')
     rating = serializers.IntegerField(read_only=True)
+    scores = ScoreCountsField(source='score_counts')
 
     class Meta:
         model = Title
@@ -81,10 +154,25 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'description',
             'genre',
             'category',
+            'scores',
         )
+        optional_fields = ('scores',)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'expanded_reviews'):
+            data['reviews'] = ReviewSerializer(
+                instance.expanded_reviews,
+                many=True,
+                context={**self.context, 'fields': None}
+            ).data
+        return data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для модели отзыва на произведение."""
 
     author = serializers.SlugRelatedField(
@@ -98,17 +186,37 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         if self.context['request'].method == 'POST':
-            if Review.objects.filter(
+            if Review.objects.visible().filter(
                     title_id=self.context['view'].kwargs.get('title_id'),
-                    author=self.context['request'].user
+                    author_id=self.context['request'].user.id
             ).exists():
                 raise serializers.ValidationError(
                     'Вы уже оставили отзыв к этому произведению.'
                 )
         return data
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'expanded_comments'):
+            data['comments'] = CommentSerializer(
+                instance.expanded_comments, many=True, context=self.context
+            ).data
+        return data
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class TitlePageReviewSerializer(ReviewSerializer):
+    """Сериализатор отзыва для страницы произведения."""
+
+    comment_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comment_count',)
+
+
+class CommentSerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для модели комментария к отзыву."""
 
     author = serializers.SlugRelatedField(
@@ -121,6 +229,54 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
+class ModerationSerializer(serializers.Serializer):
+    """Сериализатор массовой модерации отзывов и комментариев."""
+
+    DELETE = 'delete'
+    HIDE = 'hide'
+    SHOW = 'show'
+
+    action = serializers.ChoiceField(choices=(DELETE, HIDE, SHOW))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MODERATION_BULK_LIMIT,
+        required=False
+    )
+    author = serializers.SlugRelatedField(
+        queryset=User.objects.all(),
+        slug_field='username',
+        required=False
+    )
+
+    def validate(self, data):
+        if 'ids' not in data and 'author' not in data:
+            raise serializers.ValidationError(
+                'Укажите список `ids` или автора `author`.'
+            )
+        return data
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Сериализатор одного запроса из пакета."""
+
+    method = serializers.ChoiceField(choices=('GET',), default='GET')
+    url = serializers.RegexField(
+        r'^/api/v1/',
+        error_messages={'invalid': 'Поддерживаются только адреса /api/v1/.'}
+    )
+
+
+class BatchSerializer(serializers.Serializer):
+    """Сериализатор пакета запросов."""
+
+    requests = serializers.ListField(
+        child=SubRequestSerializer(),
+        allow_empty=False,
+        max_length=BATCH_MAX_REQUESTS
+    )
+
+
 class SignUpSerializer(
     serializers.Serializer,
     UsernameValidationMixin
@@ -145,16 +301,22 @@ class SignUpSerializer(
     def validate(self, data):
         email = data.get('email')
         username = data.get('username')
-
-        if User.objects.filter(email=email, username=username):
+        users = list(User.objects.filter(
+            Q(email=email) | Q(username=username)
+        ).order_by()[:2])
+        self.existing_user = next((
+            user for user in users
+            if user.email == email and user.username == username
+        ), None)
+        if self.existing_user is not None:
             return data
 
-        if User.objects.filter(email=email).exists():
+        if any(user.email == email for user in users):
             raise serializers.ValidationError(
                 'Пользователь с таким username уже существует, '
                 'но email не совпадает'
             )
-        if User.objects.filter(username=username).exists():
+        if users:
             raise serializers.ValidationError(
                 'Пользователь с таким email уже существует, '
                 'но username не совпадает'
@@ -163,20 +325,23 @@ class SignUpSerializer(
 
     def create(self, validated_data):
         email = validated_data['email']
-        username = validated_data['username']
         confirmation_code = generate_confirmation_code()
-        user, created = User.objects.update_or_create(
-            username=username,
-            defaults={
-                'email': email,
-                'confirmation_code': confirmation_code
-            }
-        )
-        send_code_email(email, confirmation_code)
+        user = getattr(self, 'existing_user', None)
+        update_fields = User.CONFIRMATION_FIELDS
+        if user is None:
+            user = User(username=validated_data['username'], email=email)
+            update_fields = None
+        user.set_confirmation_code(confirmation_code)
+        with transaction.atomic():
+            user.save(update_fields=update_fields)
+            send_code_email(
+                email, confirmation_code, user.confirmation_code_expires_at
+            )
         return user
 
 
 class AdminCreateUserSerializer(
+    SparseFieldsSerializerMixin,
     serializers.ModelSerializer,
     UsernameValidationMixin
 ):
@@ -194,19 +359,36 @@ class AdminCreateUserSerializer(
         )
 
 
+class UserBulkSerializer(AdminCreateUserSerializer):
+    """Сериализатор строки пакетной загрузки пользователей.
+
+    Уникальность username и email проверяется сразу для всего пакета,
+    поэтому валидаторы уникальности полей отключены.
+    """
+
+    class Meta(AdminCreateUserSerializer.Meta):
+        extra_kwargs = {
+            'email': {'validators': ()},
+            'username': {'validators': ()},
+        }
+
+
 class TokenSerializer(serializers.Serializer):
     """Сериализатор для получения токена."""
 
     username = serializers.CharField(write_only=True)
     confirmation_code = serializers.CharField(required=True,
                                               write_only=True)
+    access = serializers.CharField(read_only=True)
 
     def validate(self, data):
-        username = data['username']
-        confirmation_code = data['confirmation_code']
-        user = get_object_or_404(User, username=username)
-        if (not confirmation_code
-           or confirmation_code != user.confirmation_code):
+        try:
+            consumed = User.objects.consume_confirmation_code(
+                data['username'], data['confirmation_code']
+            )
+        except User.DoesNotExist:
+            raise Http404('Пользователь не найден.')
+        if not consumed:
             raise serializers.ValidationError(
                 {'non_field_errors': ['Неверный код подтверждения']},
                 code='invalid_code'
@@ -215,10 +397,7 @@ class TokenSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         user = User.objects.get(username=validated_data['username'])
-        user.is_active = True
-        token = RefreshToken.for_user(user)
-        user.confirmation_code = None
-        user.save()
+        token = ClaimsRefreshToken.for_user(user)
         return {
             'access': str(token.access_token),
         }
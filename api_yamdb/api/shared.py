@@ -0,0 +1,266 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SharedMemoryFile:
+    """Файл фиксированного размера, отображённый в память.
+
+    Все процессы сервера отображают один и тот же файл, поэтому
+    запись в одном процессе сразу видна в остальных. Записи
+    сериализуются блокировкой участка файла там, где доступен fcntl,
+    и блокировкой потоков внутри процесса.
+    """
+
+    def __init__(self, path, length):
+        self.path = path
+        self.length = length
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def clear(self):
+        data = self._open()
+        with self._locked():
+            data[:] = bytes(self.length)
+
+    def _open(self):
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    self._file = open(self.path, 'a+b')
+                    if os.fstat(self._file.fileno()).st_size < self.length:
+                        os.ftruncate(self._file.fileno(), self.length)
+                    self._map = mmap.mmap(self._file.fileno(), self.length)
+        return self._map
+
+    @contextmanager
+    def _locked(self, offset=0, length=0):
+        """Блокировка участка файла; `length` = 0 — до конца файла."""
+
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.lockf(self._file, fcntl.LOCK_EX, length, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._file, fcntl.LOCK_UN, length, offset)
+
+
+class SharedBloomFilter(SharedMemoryFile):
+    """Фильтр Блума в общей памяти процессов из двух поколений.
+
+    Ключ записывается в поколение текущего периода длиной `period`
+    секунд и находится, пока идёт этот период или следующий, то есть
+    от `period` до 2 * `period` секунд. Поколение прошедшего периода
+    очищается первой записью в новом периоде, поэтому доля ложных
+    срабатываний не растёт со временем. Проверка только читает память,
+    запись блокирует файл целиком.
+    """
+
+    header = struct.Struct('<qq')
+
+    def __init__(self, path, size, hashes, period):
+        self.generation_size = (size + 7) // 8
+        super().__init__(
+            path, self.header.size + 2 * self.generation_size
+        )
+        self.size = size
+        self.hashes = hashes
+        self.period = period
+
+    def __contains__(self, key):
+        data = self._open()
+        period = self.get_period()
+        positions = self._positions(key)
+        for generation, stored in enumerate(self.header.unpack_from(data)):
+            if stored not in (period, period - 1):
+                continue
+            offset = self.get_offset(generation)
+            if all(
+                data[offset + (position >> 3)] & 1 << (position & 7)
+                for position in positions
+            ):
+                return True
+        return False
+
+    def add(self, key):
+        data = self._open()
+        period = self.get_period()
+        generation = period % 2
+        offset = self.get_offset(generation)
+        with self._locked():
+            periods = list(self.header.unpack_from(data))
+            if periods[generation] != period:
+                data[offset:offset + self.generation_size] = bytes(
+                    self.generation_size
+                )
+                periods[generation] = period
+                self.header.pack_into(data, 0, *periods)
+            for position in self._positions(key):
+                data[offset + (position >> 3)] |= 1 << (position & 7)
+
+    def get_period(self):
+        return int(time.time() // self.period)
+
+    def get_offset(self, generation):
+        return self.header.size + generation * self.generation_size
+
+    def _positions(self, key):
+        digest = hashlib.sha256(key.encode()).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:16], 'little') | 1
+        return [
+            (first + index * step) % self.size
+            for index in range(self.hashes)
+        ]
+
+
+class SharedSlotTable(SharedMemoryFile):
+    """Таблица из `slots` ячеек формата `slot` в общей памяти процессов.
+
+    Ключ хешируется в одну ячейку, первое поле которой — отпечаток
+    ключа. Обращение стоит O(1) и блокирует только свою ячейку. При
+    совпадении ячеек у разных ключей ячейка начинается заново.
+    """
+
+    slot = None
+
+    def __init__(self, path, slots):
+        super().__init__(path, slots * self.slot.size)
+        self.slots = slots
+
+    def get_slot(self, key):
+        """Отпечаток ключа и смещение его ячейки."""
+
+        fingerprint = int.from_bytes(
+            hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little'
+        ) or 1
+        return fingerprint, fingerprint % self.slots * self.slot.size
+
+
+class SharedTokenBuckets(SharedSlotTable):
+    """Корзины токенов: отпечаток, число токенов, время обновления.
+
+    Коллизия ключей только ослабляет лимит: корзина начинается полной.
+    """
+
+    slot = struct.Struct('<Qdd')
+
+    def consume(self, key, capacity, rate):
+        """Взять токен из корзины `key`.
+
+        Корзина вмещает `capacity` токенов и пополняется на `rate`
+        токенов в секунду. Возвращает пару (разрешено, сколько секунд
+        ждать следующего токена).
+        """
+
+        fingerprint, offset = self.get_slot(key)
+        data = self._open()
+        with self._locked(offset, self.slot.size):
+            stored, tokens, updated = self.slot.unpack_from(data, offset)
+            now = time.time()
+            if stored != fingerprint:
+                tokens, updated = capacity, now
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.slot.pack_into(data, offset, fingerprint, tokens, now)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+class SharedSlidingWindows(SharedSlotTable):
+    """Счётчики скользящего окна: отпечаток, номер окна, два счётчика.
+
+    Хранятся счётчики текущего и предыдущего фиксированных окон; число
+    запросов за последние `window` секунд оценивается как взвешенная
+    сумма двух счётчиков.
+    """
+
+    slot = struct.Struct('<QqII')
+
+    def hit(self, key, limit, window):
+        """Учесть запрос по ключу `key`, если лимит не превышен.
+
+        Возвращает пару (разрешено, сколько секунд ждать). Нулевой
+        лимит запрещает все запросы: ждать нужно целое окно.
+        """
+
+        if limit <= 0:
+            return False, window
+        fingerprint, offset = self.get_slot(key)
+        data = self._open()
+        with self._locked(offset, self.slot.size):
+            stored, index, current, previous = self.slot.unpack_from(
+                data, offset
+            )
+            now = time.time()
+            now_index, elapsed = divmod(now, window)
+            now_index = int(now_index)
+            if stored != fingerprint or index < now_index - 1:
+                current = previous = 0
+            elif index == now_index - 1:
+                current, previous = 0, current
+            weight = 1 - elapsed / window
+            allowed = previous * weight + current + 1 <= limit
+            if allowed:
+                current += 1
+            self.slot.pack_into(
+                data, offset, fingerprint, now_index, current, previous
+            )
+        if allowed:
+            return True, 0
+        if current + 1 > limit:
+            return False, window - elapsed + window * max(
+                0, 1 - (limit - 1) / current
+            )
+        return False, window * (1 - (limit - current - 1) / previous) - elapsed
+
+
+class SharedCounters(SharedSlotTable):
+    """Счётчики по строковым ключам: отпечаток и значение.
+
+    Рассчитана на небольшое число ключей, например области ограничений.
+    При совпадении ячеек ключ занимает следующую свободную ячейку,
+    поэтому разные ключи не делят один счётчик.
+    """
+
+    slot = struct.Struct('<QQ')
+
+    def increment(self, key):
+        fingerprint, start = self.get_slot(key)
+        data = self._open()
+        with self._locked():
+            offset, count = self._find(data, fingerprint, start)
+            if offset is not None:
+                self.slot.pack_into(data, offset, fingerprint, count + 1)
+
+    def get(self, key):
+        fingerprint, start = self.get_slot(key)
+        data = self._open()
+        with self._locked():
+            return self._find(data, fingerprint, start)[1]
+
+    def _find(self, data, fingerprint, start):
+        """Смещение и значение ячейки ключа; (None, 0), если места нет."""
+
+        for index in range(self.slots):
+            offset = (start + index * self.slot.size) % self.length
+            stored, count = self.slot.unpack_from(data, offset)
+            if stored == fingerprint:
+                return offset, count
+            if not stored:
+                return offset, 0
+        return None, 0
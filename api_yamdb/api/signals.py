@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import invalidate_user_tokens, revoke_user_tokens
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def update_user_tokens(sender, instance, **kwargs):
+    """Сброс закешированных токенов при изменении пользователя."""
+
+    invalidate_user_tokens(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Отзыв всех токенов удалённого пользователя."""
+
+    revoke_user_tokens(instance)
@@ -0,0 +1,182 @@
+import logging
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from api.shared import (
+    SharedCounters,
+    SharedSlidingWindows,
+    SharedTokenBuckets,
+)
+from reviews.constants import (
+    ADMIN,
+    MODERATOR,
+    THROTTLE_REJECTION_SLOTS,
+    THROTTLE_SLOTS,
+    USER,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Хранилища создаются при первом обращении, поэтому пути к файлам
+# можно переопределить в настройках до начала работы.
+token_buckets = SimpleLazyObject(lambda: SharedTokenBuckets(
+    settings.THROTTLE_STORE_FILE, THROTTLE_SLOTS
+))
+rate_windows = SimpleLazyObject(lambda: SharedSlidingWindows(
+    settings.RATE_WINDOW_STORE_FILE, THROTTLE_SLOTS
+))
+rejections = SimpleLazyObject(lambda: SharedCounters(
+    settings.THROTTLE_REJECTIONS_FILE, THROTTLE_REJECTION_SLOTS
+))
+
+
+class SharedThrottle(BaseThrottle):
+    """Ограничение частоты запросов с общим для процессов хранилищем.
+
+    Лимит `rate` записывается как в DRF, например '5/hour', и по
+    умолчанию берётся из DEFAULT_THROTTLE_RATES по `scope`; лимит None
+    снимает ограничение. Отказы считаются по `scope` в общих для
+    процессов счётчиках `rejections`, их выводит команда throttle_stats.
+    """
+
+    scope = None
+    rate = None
+    durations = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+    def get_scope(self, request):
+        return self.scope
+
+    def parse_rate(self, rate):
+        requests, period = rate.split('/')
+        return int(requests), self.durations[period[0]]
+
+    def get_key(self, request, view):
+        """Ключ ограничения или None, если запрос не ограничивается."""
+
+        raise NotImplementedError
+
+    def consume(self, key, limit, duration):
+        """Учесть запрос. Возвращает пару (разрешено, ожидание)."""
+
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        scope = self.get_scope(request)
+        rate = self.rate or api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        allowed, self.delay = self.consume(
+            f'{scope}:{key}', *self.parse_rate(rate)
+        )
+        if not allowed:
+            rejections.increment(scope)
+            logger.warning(
+                'Запрос к %s отклонён ограничением %s.', request.path, scope
+            )
+        return allowed
+
+    def wait(self):
+        return self.delay
+
+
+class TokenBucketThrottle(SharedThrottle):
+    """Корзина токенов: `rate` '5/hour' — 5 токенов, пополнение за час."""
+
+    def consume(self, key, limit, duration):
+        if limit <= 0:
+            return False, duration
+        return token_buckets.consume(key, limit, limit / duration)
+
+
+class SlidingWindowThrottle(SharedThrottle):
+    """Не больше `rate` запросов за любое скользящее окно."""
+
+    def consume(self, key, limit, duration):
+        return rate_windows.hit(key, limit, duration)
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на IP-адрес клиента."""
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class RequestFieldThrottle(TokenBucketThrottle):
+    """Корзина на значение поля `field` в теле запроса.
+
+    Если тело запроса не объект, ограничение идёт по IP-адресу.
+    """
+
+    field = None
+
+    def get_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return self.get_ident(request)
+        value = request.data.get(self.field)
+        if not isinstance(value, str) or not value:
+            return None
+        return value.strip().lower()
+
+
+class SignUpIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignUpUsernameThrottle(RequestFieldThrottle):
+    scope = 'signup_username'
+    field = 'username'
+
+
+class SignUpEmailThrottle(RequestFieldThrottle):
+    scope = 'signup_email'
+    field = 'email'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(RequestFieldThrottle):
+    scope = 'token_username'
+    field = 'username'
+
+
+class RoleWriteThrottle(SlidingWindowThrottle):
+    """Ограничение записи на пользователя с лимитом по его роли.
+
+    Лимит берётся из DEFAULT_THROTTLE_RATES по ключу `<scope>_<роль>`.
+    """
+
+    def get_key(self, request, view):
+        if request.method in SAFE_METHODS or not (
+            request.user.is_authenticated
+        ):
+            return None
+        return request.user.id
+
+    def get_scope(self, request):
+        if request.user.is_admin:
+            role = ADMIN
+        elif request.user.is_moderator:
+            role = MODERATOR
+        else:
+            role = USER
+        return f'{self.scope}_{role}'
+
+
+class ReviewWriteThrottle(RoleWriteThrottle):
+    scope = 'reviews'
+
+
+class CommentWriteThrottle(RoleWriteThrottle):
+    scope = 'comments'
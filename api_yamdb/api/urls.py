@@ -2,9 +2,12 @@ from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
 from api.views import (
+    BatchViewSet,
     CategoryViewSet,
+    CommentModerationViewSet,
     CommentViewSet,
     GenreViewSet,
+    ReviewModerationViewSet,
     ReviewViewSet,
     TitleViewSet,
     SignUpViewSet,
@@ -33,7 +36,22 @@ urlpatterns_auth = [
     path('token/', TokenViewSet.as_view(), name='create_token'),
 ]
 
+urlpatterns_moderation = [
+    path(
+        'reviews/',
+        ReviewModerationViewSet.as_view(),
+        name='moderation_reviews'
+    ),
+    path(
+        'comments/',
+        CommentModerationViewSet.as_view(),
+        name='moderation_comments'
+    ),
+]
+
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(urlpatterns_auth)),
+    path('v1/moderation/', include(urlpatterns_moderation)),
+    path('v1/batch/', BatchViewSet.as_view(), name='batch'),
 ]
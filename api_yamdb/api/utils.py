@@ -1,21 +1,28 @@
-import random
+import secrets
+import string
 
-from django.conf import settings
-from django.core.mail import send_mail
+from reviews.constants import MAX_CODE_LENGTH
+from users.models import OutboxEmail
 
 
-def send_code_email(email, code):
-    """Функция для отправки кода подтверждения на почту."""
+def send_code_email(email, code, expires_at):
+    """Постановка письма с кодом подтверждения в очередь отправки.
 
-    send_mail(
-        'Код подтверждения',
-        f'Ваш код подтверждения: {code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [email]
+    Письмо действует, пока действует код: позже оно не отправляется
+    и удаляется вместе с истёкшими кодами.
+    """
+
+    OutboxEmail.objects.create(
+        recipient=email,
+        subject='Код подтверждения',
+        body=f'Ваш код подтверждения: {code}',
+        expires_at=expires_at
     )
 
 
 def generate_confirmation_code():
     """Функция для генерации кода подтверждения."""
 
-    return ''.join(random.choices('0123456789', k=6))
+    return ''.join(
+        secrets.choice(string.digits) for _ in range(MAX_CODE_LENGTH)
+    )
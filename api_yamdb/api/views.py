@@ -1,9 +1,18 @@
+import csv
+import io
+import time
+from itertools import islice
+from urllib.parse import urlsplit
+
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Avg, IntegerField
-from django.db.models.functions import Round
-from django.shortcuts import get_object_or_404
-from rest_framework import generics, status
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q
+from django.http import Http404, HttpRequest, QueryDict
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import generics, serializers, status
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.mixins import (
@@ -12,37 +21,76 @@ from rest_framework.mixins import (
     ListModelMixin,
 )
 from rest_framework.permissions import (
+    SAFE_METHODS,
     AllowAny,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 
-from api.filters import TitleFilter
+from api.authentication import invalidate_user_tokens
+from api.filters import TitleFilter, get_title_facets, parse_facets
+from api.mixins import AsyncReadViewSetMixin, SparseFieldsViewSetMixin
 from api.permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
     IsAuthorOrModeratorOrAdminOrReadOnly,
+    IsModeratorOrAdmin,
 )
 from api.serializers import (
     AdminCreateUserSerializer,
+    BatchSerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
+    ModerationSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitlePageReviewSerializer,
+    TitleReadSerializer,
     TitleSerializer,
     TokenSerializer,
+    UserBulkSerializer,
     UserSerializer,
 )
-from reviews.models import Category, Genre, Review, Title
+from api.throttling import (
+    CommentWriteThrottle,
+    ReviewWriteThrottle,
+    SignUpEmailThrottle,
+    SignUpIPThrottle,
+    SignUpUsernameThrottle,
+    TokenIPThrottle,
+    TokenUsernameThrottle,
+)
+from reviews.constants import (
+    BATCH_TIMEOUT,
+    EXPAND_COMMENTS_LIMIT,
+    EXPAND_REVIEWS_LIMIT,
+    MAX_ID,
+    RECOMMENDATIONS_LIMIT,
+    TITLES_BATCH_LIMIT,
+    TITLES_BULK_LIMIT,
+    USERS_BULK_LIMIT,
+)
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Recommendation,
+    Review,
+    Title,
+)
+from reviews.signals import defer_title_stats
 
 
 User = get_user_model()
 
 
 class AbstractCreateDeleteListViewSet(
+    AsyncReadViewSetMixin,
+    SparseFieldsViewSetMixin,
     CreateModelMixin,
     ListModelMixin,
     DestroyModelMixin,
@@ -70,14 +118,13 @@ class GenreViewSet(AbstractCreateDeleteListViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(
+    AsyncReadViewSetMixin, SparseFieldsViewSetMixin, ModelViewSet
+):
     """ViewSet для управления произведениями."""
 
-    queryset = Title.objects.annotate(
-        rating=Round(
-            Avg('reviews__score'),
-            output_field=IntegerField(),
-        )
+    queryset = Title.objects.select_related(
+        'category'
     ).prefetch_related('genres').order_by('name')
     serializer_class = TitleSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly,)
@@ -86,44 +133,458 @@ class TitleViewSet(ModelViewSet):
     ordering_fields = ('name', 'year', 'rating')
     ordering = ('name',)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    lookup_value_regex = r'\d+'
+    expansions = ('reviews', 'reviews.comments')
+
+    def get_expand(self):
+        """Разбор параметра `expand` со встраиваемыми связями."""
+
+        value = self.request.query_params.get('expand')
+        if self.request.method not in SAFE_METHODS or not value:
+            return set()
+        expand = {name for name in value.split(',') if name}
+        unknown = expand - set(self.expansions)
+        if unknown:
+            raise serializers.ValidationError({'expand': [
+                f'Неизвестные связи: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(self.expansions)}.'
+            ]})
+        return expand
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        expand = self.get_expand()
+        if not expand:
+            return queryset
+        reviews = Review.objects.visible().select_related('author')
+        if 'reviews.comments' in expand:
+            reviews = reviews.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.visible().select_related(
+                    'author'
+                )[:EXPAND_COMMENTS_LIMIT],
+                to_attr='expanded_comments'
+            ))
+        return queryset.prefetch_related(Prefetch(
+            'reviews',
+            queryset=reviews[:EXPAND_REVIEWS_LIMIT],
+            to_attr='expanded_reviews'
+        ))
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return TitleReadSerializer
+        return TitleSerializer
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if len(request.data) > TITLES_BULK_LIMIT:
+            raise serializers.ValidationError({'non_field_errors': [
+                f'Можно создать не более {TITLES_BULK_LIMIT} произведений.'
+            ]})
+        context = self.get_serializer_context()
+        context['slug_objects'] = self.get_slug_objects(request.data)
+        serializer = TitleSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=TITLES_BULK_LIMIT,
+            context=context
+        )
+        serializer.is_valid(raise_exception=True)
+        pks = [title.pk for title in serializer.save()]
+        titles = self.get_queryset().in_bulk(pks)
+        return Response(
+            TitleReadSerializer(
+                [titles[pk] for pk in pks], many=True, context=context
+            ).data,
+            status=status.HTTP_201_CREATED
+        )
 
+    def get_slug_objects(self, items):
+        """Категории и жанры пакета, загруженные двумя запросами.
+
+        Собираются только строковые slug: остальные значения отклонит
+        сериализатор.
+        """
+
+        items = [item for item in items if isinstance(item, dict)]
+        categories = {
+            item['category'] for item in items
+            if isinstance(item.get('category'), str)
+        }
+        genres = {
+            slug for item in items
+            if isinstance(item.get('genre'), list)
+            for slug in item['genre'] if isinstance(slug, str)
+        }
+        return {
+            model: model.objects.in_bulk(slugs, field_name='slug')
+            for model, slugs in ((Category, categories), (Genre, genres))
+        }
+
+    def get_requested_ids(self):
+        """Разбор параметра `ids` со списком id через запятую."""
+
+        try:
+            ids = [
+                int(pk) for pk in self.request.query_params['ids'].split(',')
+            ]
+        except ValueError:
+            raise serializers.ValidationError(
+                {'ids': ['Ожидается список целых чисел через запятую.']}
+            )
+        if not all(1 <= pk <= MAX_ID for pk in ids):
+            raise serializers.ValidationError({'ids': [
+                f'Id должны быть в диапазоне от 1 до {MAX_ID}.'
+            ]})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > TITLES_BATCH_LIMIT:
+            raise serializers.ValidationError({'ids': [
+                f'Можно запросить не более {TITLES_BATCH_LIMIT} произведений.'
+            ]})
+        return ids
+
+    def list_by_ids(self, ids):
+        titles = self.get_queryset().in_bulk(ids)
+        return Response({
+            'results': self.get_serializer(
+                [titles[pk] for pk in ids if pk in titles], many=True
+            ).data,
+            'missing': [pk for pk in ids if pk not in titles],
+        })
+
+    def list_ranked(self, ranking):
+        """Произведения по убыванию предрассчитанного поля `ranking`."""
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{f'{ranking}__isnull': False}
+        ).order_by(f'-{ranking}', 'name')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            self.get_serializer(page, many=True).data
+        )
+
+    @action(methods=('get',), detail=False)
+    def top(self, request):
+        """Лучшие произведения по байесовскому рейтингу."""
+
+        return self.list_ranked('bayesian')
+
+    @action(methods=('get',), detail=False)
+    def trending(self, request):
+        """Произведения, которые активно обсуждают в последнее время."""
+
+        return self.list_ranked('trending')
+
+    @action(methods=('get',), detail=True)
+    def similar(self, request, pk=None):
+        """Произведения, которые те же пользователи оценивают похоже."""
+
+        titles = self.get_queryset().filter(similar_to__title_id=pk).annotate(
+            similarity=F('similar_to__score')
+        ).order_by('-similarity', 'name')
+        if not titles and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        data = self.get_serializer(titles, many=True).data
+        for item, title in zip(data, titles):
+            item['similarity'] = title.similarity
+        return Response({'results': data})
 
-class ReviewViewSet(ModelViewSet):
+    @action(methods=('get',), detail=True)
+    def scores(self, request, pk=None):
+        """Распределение оценок произведения."""
+
+        title = get_object_or_404(
+            Title.objects.only('review_count', 'score_counts'), pk=pk
+        )
+        return Response({
+            'id': title.pk,
+            'review_count': title.review_count,
+            'scores': title.get_score_counts(),
+        })
+
+    @action(methods=('get',), detail=True)
+    def page(self, request, pk=None):
+        """Страница произведения: карточка, оценки и первые отзывы."""
+
+        title = self.get_object()
+        page_size = self.paginator.page_size
+        reviews = title.reviews.visible().select_related('author').annotate(
+            comment_count=Count(
+                'comments', filter=Q(comments__is_hidden=False)
+            )
+        )[:page_size]
+        next_url = None
+        if title.review_count > page_size:
+            next_url = replace_query_param(
+                request.build_absolute_uri(
+                    reverse('reviews-list', kwargs={'title_id': title.pk})
+                ),
+                self.paginator.page_query_param,
+                2
+            )
+        return Response({
+            'title': self.get_serializer(title).data,
+            'scores': title.get_score_counts(),
+            'reviews': {
+                'count': title.review_count,
+                'next': next_url,
+                'results': TitlePageReviewSerializer(
+                    reviews, many=True, context={'request': request}
+                ).data,
+            },
+        })
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' in request.query_params:
+            return self.list_by_ids(self.get_requested_ids())
+        facets = request.query_params.get('facets')
+        if facets is not None:
+            facets = parse_facets(facets)
+        response = super().list(request, *args, **kwargs)
+        if facets:
+            response.data['facets'] = get_title_facets(
+                self.filter_queryset(self.get_queryset()), facets
+            )
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        if {'ids', 'facets'} & set(request.query_params):
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+        return await super().alist(request, *args, **kwargs)
+
+
+class ReviewViewSet(
+    AsyncReadViewSetMixin, SparseFieldsViewSetMixin, ModelViewSet
+):
     """ViewSet для управления отзывами."""
 
+    queryset = Review.objects.visible().select_related('author')
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrModeratorOrAdminOrReadOnly,)
+    throttle_classes = (ReviewWriteThrottle,)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    title = None
 
     def perform_create(self, serializer):
         serializer.save(title=self.get_title(), author=self.request.user)
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return super().get_queryset().filter(title=self.get_title())
+
+    async def aget_queryset(self):
+        self.title = await aget_object_or_404(
+            Title, pk=self.kwargs.get('title_id')
+        )
+        return await super().aget_queryset()
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if self.title is None:
+            self.title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self.title
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(
+    AsyncReadViewSetMixin, SparseFieldsViewSetMixin, ModelViewSet
+):
     """ViewSet для управления комментариями."""
 
+    queryset = Comment.objects.visible().select_related('author')
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrModeratorOrAdminOrReadOnly,)
+    throttle_classes = (CommentWriteThrottle,)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    review = None
 
     def perform_create(self, serializer):
         serializer.save(review=self.get_review(), author=self.request.user)
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return super().get_queryset().filter(review=self.get_review())
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
+    async def aget_queryset(self):
+        self.review = await aget_object_or_404(
+            Review.objects.visible(),
             pk=self.kwargs.get('review_id'),
             title_id=self.kwargs.get('title_id')
         )
+        return await super().aget_queryset()
+
+    def get_review(self):
+        if self.review is None:
+            self.review = get_object_or_404(
+                Review.objects.visible(),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self.review
+
+
+class AbstractModerationViewSet(generics.GenericAPIView):
+    """Абстрактный ViewSet массовой модерации.
+
+    Удаляет, скрывает или возвращает записи по списку id и/или автору
+    в одной транзакции и отвечает количеством затронутых строк.
+    """
+
+    serializer_class = ModerationSerializer
+    permission_classes = (IsModeratorOrAdmin,)
+    model = None
+    affected_models = ()
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.model.objects.all()
+        if 'ids' in serializer.validated_data:
+            queryset = queryset.filter(pk__in=serializer.validated_data['ids'])
+        if 'author' in serializer.validated_data:
+            queryset = queryset.filter(
+                author=serializer.validated_data['author']
+            )
+        action = serializer.validated_data['action']
+        with transaction.atomic():
+            if action == ModerationSerializer.DELETE:
+                affected = self.perform_delete(queryset)
+            else:
+                affected = self.perform_hide(
+                    queryset, action == ModerationSerializer.HIDE
+                )
+        return Response(affected, status=status.HTTP_200_OK)
+
+    def perform_delete(self, queryset):
+        _, deleted = queryset.delete()
+        return {
+            model._meta.default_related_name: deleted.get(
+                model._meta.label, 0
+            )
+            for model in self.affected_models
+        }
+
+    def perform_hide(self, queryset, is_hidden):
+        return {
+            self.model._meta.default_related_name: queryset.update(
+                is_hidden=is_hidden
+            )
+        }
+
+
+class ReviewModerationViewSet(AbstractModerationViewSet):
+    """Массовая модерация отзывов."""
+
+    model = Review
+    affected_models = (Review, Comment)
+
+    def perform_delete(self, queryset):
+        with defer_title_stats():
+            return super().perform_delete(queryset)
+
+    def perform_hide(self, queryset, is_hidden):
+        titles = Title.objects.filter(pk__in=queryset.values('title_id'))
+        if not is_hidden:
+            queryset = queryset.exclude(self.get_duplicates(queryset))
+        affected = super().perform_hide(queryset, is_hidden)
+        titles.update_stats()
+        return affected
+
+    def get_duplicates(self, queryset):
+        """Условие для отзывов, которые нельзя вернуть.
+
+        У автора может быть только один видимый отзыв на произведение,
+        поэтому отзыв не возвращается, если уже есть видимый отзыв
+        того же автора или среди возвращаемых есть более новый.
+        """
+
+        return Exists(Review.objects.filter(
+            Q(is_hidden=False)
+            | Q(pk__gt=OuterRef('pk'), pk__in=queryset.values('pk')),
+            title=OuterRef('title'),
+            author=OuterRef('author'),
+        ).exclude(pk=OuterRef('pk')))
+
+
+class CommentModerationViewSet(AbstractModerationViewSet):
+    """Массовая модерация комментариев."""
+
+    model = Comment
+    affected_models = (Comment,)
+
+
+class BatchViewSet(generics.GenericAPIView):
+    """Выполнение пакета GET-запросов к API за один вызов.
+
+    Подзапросы выполняются в том же процессе с уже аутентифицированным
+    пользователем: токен проверяется и пользователь загружается один раз.
+
+    BATCH_TIMEOUT — мягкий лимит: время проверяется перед каждым
+    подзапросом, а уже начатый подзапрос не прерывается. Подзапросы,
+    до которых очередь дошла после истечения срока, не выполняются
+    и помечаются `skipped`.
+    """
+
+    serializer_class = BatchSerializer
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deadline = time.monotonic() + BATCH_TIMEOUT
+        responses = []
+        for sub_request in serializer.validated_data['requests']:
+            if time.monotonic() > deadline:
+                responses.append({
+                    'url': sub_request['url'],
+                    'status': status.HTTP_504_GATEWAY_TIMEOUT,
+                    'skipped': True,
+                    'body': {
+                        'detail': 'Не выполнен: истекло время выполнения '
+                                  'пакета.'
+                    },
+                })
+                continue
+            responses.append(self.perform_sub_request(request, sub_request))
+        return Response(responses, status=status.HTTP_200_OK)
+
+    def perform_sub_request(self, request, sub_request):
+        url = sub_request['url']
+        path, query = urlsplit(url)[2:4]
+        try:
+            match = resolve(path)
+        except Resolver404:
+            match = None
+        if match is None or match.url_name == 'batch':
+            return {
+                'url': url,
+                'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Страница не найдена.'},
+            }
+        sub = HttpRequest()
+        sub.method = sub_request['method']
+        sub.path = sub.path_info = path
+        sub.META = {
+            key: value for key, value in request.META.items()
+            if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE')
+        }
+        sub.META.update(
+            REQUEST_METHOD=sub.method, PATH_INFO=path, QUERY_STRING=query
+        )
+        sub.GET = QueryDict(query)
+        if request.user.is_authenticated:
+            sub._force_auth_user = request.user
+            sub._force_auth_token = request.auth
+        view = match.func
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(sub, *match.args, **match.kwargs)
+        return {
+            'url': url,
+            'status': response.status_code,
+            'body': getattr(response, 'data', None),
+        }
 
 
 class SignUpViewSet(generics.CreateAPIView):
@@ -132,6 +593,9 @@ class SignUpViewSet(generics.CreateAPIView):
     model = User
     serializer_class = SignUpSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = (
+        SignUpIPThrottle, SignUpUsernameThrottle, SignUpEmailThrottle
+    )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -145,6 +609,7 @@ class TokenViewSet(generics.CreateAPIView):
 
     serializer_class = TokenSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -153,7 +618,7 @@ class TokenViewSet(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(SparseFieldsViewSetMixin, ModelViewSet):
     """ViewSet для управления пользователями."""
 
     queryset = User.objects.all()
@@ -164,6 +629,111 @@ class UserViewSet(ModelViewSet):
     search_fields = ('=username',)
     http_method_names = ('get', 'patch', 'post', 'delete')
 
+    def perform_destroy(self, instance):
+        with defer_title_stats():
+            instance.delete()
+
+    def create(self, request, *args, **kwargs):
+        if 'file' in request.FILES:
+            rows = self.read_csv_rows(request.FILES['file'])
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return super().create(request, *args, **kwargs)
+        if len(rows) > USERS_BULK_LIMIT:
+            raise serializers.ValidationError(
+                f'Можно загрузить не более {USERS_BULK_LIMIT} пользователей.'
+            )
+        upsert = request.query_params.get('upsert', '').lower() in (
+            '1', 'true'
+        )
+        return Response(
+            self.provision_users(rows, upsert), status=status.HTTP_200_OK
+        )
+
+    def read_csv_rows(self, file):
+        """Строки CSV-файла, но не больше USERS_BULK_LIMIT + 1.
+
+        Лишней строки достаточно, чтобы отклонить файл, поэтому
+        остаток файла не читается.
+        """
+
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8'))
+            return [
+                {field: value for field, value in row.items() if value}
+                for row in islice(reader, USERS_BULK_LIMIT + 1)
+            ]
+        except (UnicodeDecodeError, csv.Error):
+            raise serializers.ValidationError(
+                {'file': ['Ожидается CSV-файл в кодировке UTF-8.']}
+            )
+
+    def provision_users(self, rows, upsert):
+        """Пакетное создание и обновление пользователей.
+
+        Уникальность проверяется одним запросом на поле для всего пакета,
+        строки с конфликтами пропускаются и попадают в `errors`.
+        """
+
+        errors, valid = [], []
+        for row_number, row in enumerate(rows):
+            serializer = UserBulkSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((row_number, serializer.validated_data))
+            else:
+                errors.append({'row': row_number, 'errors': serializer.errors})
+        existing = User.objects.in_bulk(
+            [data['username'] for _, data in valid], field_name='username'
+        )
+        email_owners = dict(User.objects.filter(
+            email__in=[data['email'] for _, data in valid]
+        ).values_list('email', 'username'))
+
+        created, updated, seen = [], [], set()
+        for row_number, data in valid:
+            conflict = self.get_user_conflict(
+                data, existing, email_owners, seen, upsert
+            )
+            seen.add(data['username'])
+            if conflict:
+                errors.append({'row': row_number, 'errors': conflict})
+                continue
+            email_owners.setdefault(data['email'], data['username'])
+            user = existing.get(data['username'])
+            if user is None:
+                created.append(User(**data))
+                continue
+            for field, value in data.items():
+                setattr(user, field, value)
+            user.refresh_token_version()
+            updated.append(user)
+        with transaction.atomic():
+            User.objects.bulk_create(created)
+            User.objects.bulk_update(
+                updated, (*UserBulkSerializer.Meta.fields, 'token_version')
+            )
+        for user in updated:
+            invalidate_user_tokens(user)
+        return {
+            'created': [user.username for user in created],
+            'updated': [user.username for user in updated],
+            'errors': sorted(errors, key=lambda error: error['row']),
+        }
+
+    def get_user_conflict(self, data, existing, email_owners, seen, upsert):
+        if data['username'] in seen:
+            return {'username': ['Username повторяется в пакете.']}
+        if email_owners.get(data['email'], data['username']) != (
+            data['username']
+        ):
+            return {'email': ['Пользователь с таким email уже существует.']}
+        if data['username'] in existing and not upsert:
+            return {
+                'username': ['Пользователь с таким username уже существует.']
+            }
+        return None
+
     @action(
         methods=('get',),
         serializer_class=UserSerializer,
@@ -174,6 +744,36 @@ class UserViewSet(ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+        detail=False,
+        url_path='me/recommendations'
+    )
+    def recommendations(self, request):
+        """Рекомендованные пользователю произведения, которые он не оценил.
+
+        Пока рекомендации не рассчитаны, выдаются лучшие произведения
+        по байесовскому рейтингу.
+        """
+
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genres'
+        ).exclude(reviews__author_id=request.user.id)
+        title_ids = Recommendation.objects.filter(
+            user_id=request.user.id
+        ).values_list('title_ids', flat=True).first()
+        if title_ids is None:
+            titles = titles.filter(bayesian__isnull=False).order_by(
+                '-bayesian', 'name'
+            )[:RECOMMENDATIONS_LIMIT]
+        else:
+            titles = titles.in_bulk(title_ids)
+            titles = [titles[pk] for pk in title_ids if pk in titles]
+        return Response({'results': TitleReadSerializer(
+            titles, many=True, context={'request': request, 'fields': None}
+        ).data})
+
     @me.mapping.patch
     def patch_me(self, request):
         serializer = self.get_serializer(
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+
+
+class PathExemptMiddlewareMixin:
+    """Пропуск middleware для путей из MIDDLEWARE_EXEMPT_PATHS.
+
+    API аутентифицируется только по JWT, поэтому сессии, CSRF, сообщения
+    и заголовок X-Frame-Options ему не нужны. Для остальных путей,
+    например админки, middleware работает как обычно. Синхронный
+    и асинхронный режимы наследуются от исходного middleware.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.exempt_paths = tuple(settings.MIDDLEWARE_EXEMPT_PATHS)
+
+    def is_exempt(self, request):
+        return request.path_info.startswith(self.exempt_paths)
+
+    def __call__(self, request):
+        if self.is_exempt(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(
+    PathExemptMiddlewareMixin, sessions_middleware.SessionMiddleware
+):
+    """SessionMiddleware, не загружающий сессию для API."""
+
+
+class CsrfViewMiddleware(PathExemptMiddlewareMixin, csrf.CsrfViewMiddleware):
+    """CsrfViewMiddleware без проверки CSRF для API."""
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if self.is_exempt(request):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(
+    PathExemptMiddlewareMixin, auth_middleware.AuthenticationMiddleware
+):
+    """AuthenticationMiddleware без пользователя из сессии для API."""
+
+
+class MessageMiddleware(
+    PathExemptMiddlewareMixin, messages_middleware.MessageMiddleware
+):
+    """MessageMiddleware без хранилища сообщений для API."""
+
+
+class XFrameOptionsMiddleware(
+    PathExemptMiddlewareMixin, clickjacking.XFrameOptionsMiddleware
+):
+    """XFrameOptionsMiddleware без заголовка для ответов API."""
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -25,14 +26,20 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api_yamdb.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.middleware.CsrfViewMiddleware',
+    'api_yamdb.middleware.AuthenticationMiddleware',
+    'api_yamdb.middleware.MessageMiddleware',
+    'api_yamdb.middleware.XFrameOptionsMiddleware',
 ]
 
+# Асинхронные представления чтения; включаются в asgi.py.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# Пути, для которых пропускаются сессии, CSRF, сообщения и X-Frame-Options.
+MIDDLEWARE_EXEMPT_PATHS = ('/api/',)
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -58,6 +65,15 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Файл базы отображается в память: страницы каталога читаются
+            # всеми воркерами из общего page cache без копирования.
+            'init_command': 'PRAGMA mmap_size=268435456',
+            # SQLite не поддерживает SELECT ... FOR UPDATE: транзакция сразу
+            # берёт блокировку записи, поэтому чтение и запись в ней, как
+            # в TitleQuerySet.update_stats, не пересекаются с чужими.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -93,15 +109,45 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.AsyncPageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_username': '5/hour',
+        'signup_email': '5/hour',
+        'token_ip': '60/hour',
+        'token_username': '10/hour',
+        'reviews_user': '10/minute',
+        'reviews_moderator': '30/minute',
+        'reviews_admin': None,
+        'comments_user': '20/minute',
+        'comments_moderator': '60/minute',
+        'comments_admin': None,
+    },
+    # Число прокси перед приложением: IP клиента для ограничений берётся
+    # из X-Forwarded-For только за доверенными прокси, иначе REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Файлы в общей памяти процессов сервера.
+TOKEN_REVOCATION_FILE = os.getenv(
+    'TOKEN_REVOCATION_FILE', BASE_DIR / 'revoked_tokens.bloom'
+)
+THROTTLE_STORE_FILE = os.getenv(
+    'THROTTLE_STORE_FILE', BASE_DIR / 'throttle.buckets'
+)
+RATE_WINDOW_STORE_FILE = os.getenv(
+    'RATE_WINDOW_STORE_FILE', BASE_DIR / 'throttle.windows'
+)
+THROTTLE_REJECTIONS_FILE = os.getenv(
+    'THROTTLE_REJECTIONS_FILE', BASE_DIR / 'throttle.rejections'
+)
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@yamdb.ru'
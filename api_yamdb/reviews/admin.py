@@ -21,7 +21,9 @@ class GenreAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'category', 'display_genres', 'year')
+    list_display = (
+        'id', 'name', 'category', 'display_genres', 'year', 'rating'
+    )
     search_fields = ('name',)
     list_filter = ('category', 'genres', 'year')
 
@@ -32,13 +34,15 @@ class TitleAdmin(admin.ModelAdmin):
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('id', 'text', 'author', 'score', 'pub_date')
+    list_display = ('id', 'text', 'author', 'score', 'pub_date', 'is_hidden')
     search_fields = ('text', 'author__username')
-    list_filter = ('score', 'pub_date')
+    list_filter = ('score', 'pub_date', 'is_hidden')
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('id', 'review', 'text', 'author', 'pub_date')
+    list_display = (
+        'id', 'review', 'text', 'author', 'pub_date', 'is_hidden'
+    )
     search_fields = ('text', 'author__username')
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_hidden')
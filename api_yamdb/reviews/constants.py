@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 DISPLAY_LIMIT = 26
 
 MIN_REVIEW_SCORE = 1
@@ -10,7 +12,64 @@ MAX_NAME_LENGTH = 150
 MAX_EMAIL_LENGTH = 254
 MAX_BIO_LENGHT = 256
 MAX_CODE_LENGTH = 6
+CONFIRMATION_HASH_LENGTH = 64
 
 USER = 'user'
 MODERATOR = 'moderator'
 ADMIN = 'admin'
+
+YEAR_FACET_STEP = 10
+
+EXPAND_REVIEWS_LIMIT = 10
+EXPAND_COMMENTS_LIMIT = 5
+
+TITLES_BULK_LIMIT = 1000
+TITLES_BATCH_LIMIT = 100
+MAX_ID = 2 ** 63 - 1
+
+MODERATION_BULK_LIMIT = 1000
+USERS_BULK_LIMIT = 1000
+
+BATCH_MAX_REQUESTS = 20
+BATCH_TIMEOUT = 5
+
+RANKING_PRIOR_WEIGHT = 5
+RANKING_BATCH_SIZE = 1000
+
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TRENDING_HALF_LIFE = 7 * 24 * 60 * 60
+
+SIMILAR_TITLES_LIMIT = 10
+SIMILAR_BATCH_SIZE = 1000
+
+RECOMMENDATIONS_LIMIT = 20
+RECOMMENDATION_FACTORS = 16
+RECOMMENDATION_EPOCHS = 30
+RECOMMENDATION_LEARNING_RATE = 0.01
+RECOMMENDATION_REGULARIZATION = 0.05
+RECOMMENDATION_BATCH_SIZE = 1000
+
+TOKEN_CACHE_SIZE = 10000
+TOKEN_BLOOM_SIZE = 2 ** 23
+TOKEN_BLOOM_HASHES = 7
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_MAX_DELAY = 60 * 60
+OUTBOX_POLL_INTERVAL = 5
+
+CONFIRMATION_CODE_SALT = 'users.confirmation_code'
+CONFIRMATION_CODE_TTL = 15 * 60
+CONFIRMATION_MAX_ATTEMPTS = 5
+CONFIRMATION_SWEEP_INTERVAL = 5 * 60
+
+THROTTLE_SLOTS = 2 ** 16
+THROTTLE_REJECTION_SLOTS = 2 ** 8
+
+BENCHMARK_PATH = '/api/v1/categories/'
+BENCHMARK_REQUESTS = 1000
+BENCHMARK_REPEAT = 5
+BENCHMARK_CONCURRENCY = 50
+BENCHMARK_THREADS = 8
+BENCHMARK_CLIENT_DELAY = 0.2
@@ -29,6 +29,13 @@ class AbstractNameSlug(models.Model):
         return self.name[:DISPLAY_LIMIT]
 
 
+class TextPubDateAuthorQuerySet(models.QuerySet):
+    """QuerySet отзывов и комментариев."""
+
+    def visible(self):
+        return self.filter(is_hidden=False)
+
+
 class AbstractTextPubDateAuthor(models.Model):
     """Абстрактная модель для текста, даты публикации и автора."""
 
@@ -39,6 +46,9 @@ class AbstractTextPubDateAuthor(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Автор'
     )
+    is_hidden = models.BooleanField('Скрыт модератором', default=False)
+
+    objects = TextPubDateAuthorQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -0,0 +1,91 @@
+import heapq
+import random
+from collections import namedtuple
+from multiprocessing import Pool
+
+
+Factors = namedtuple('Factors', ('user_factors', 'item_factors', 'item_bias'))
+
+_item_model = None
+
+
+def train_factors(ratings, factors, epochs, learning_rate, regularization,
+                  seed=0):
+    """Матричное разложение оценок стохастическим градиентным спуском.
+
+    `ratings` — тройки (индекс пользователя, индекс произведения, оценка).
+    Оценка приближается суммой средней оценки, смещений пользователя и
+    произведения и скалярного произведения их векторов размерности
+    `factors`.
+    """
+
+    rng = random.Random(seed)
+    users = max(user for user, _, _ in ratings) + 1
+    items = max(item for _, item, _ in ratings) + 1
+    mean = sum(score for _, _, score in ratings) / len(ratings)
+    user_bias, item_bias = [0.0] * users, [0.0] * items
+    user_factors = [
+        [rng.gauss(0, 0.1) for _ in range(factors)] for _ in range(users)
+    ]
+    item_factors = [
+        [rng.gauss(0, 0.1) for _ in range(factors)] for _ in range(items)
+    ]
+    order = list(range(len(ratings)))
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for index in order:
+            user, item, score = ratings[index]
+            user_vector, item_vector = user_factors[user], item_factors[item]
+            error = score - mean - user_bias[user] - item_bias[item] - sum(
+                map(float.__mul__, user_vector, item_vector)
+            )
+            user_bias[user] += learning_rate * (
+                error - regularization * user_bias[user]
+            )
+            item_bias[item] += learning_rate * (
+                error - regularization * item_bias[item]
+            )
+            for factor in range(factors):
+                user_value = user_vector[factor]
+                user_vector[factor] += learning_rate * (
+                    error * item_vector[factor] - regularization * user_value
+                )
+                item_vector[factor] += learning_rate * (
+                    error * user_value - regularization * item_vector[factor]
+                )
+    return Factors(user_factors, item_factors, item_bias)
+
+
+def _init_item_model(item_factors, item_bias):
+    global _item_model
+    _item_model = item_factors, item_bias
+
+
+def _recommend(task):
+    user_vector, exclude, limit = task
+    item_factors, item_bias = _item_model
+    return heapq.nlargest(limit, (
+        item for item in range(len(item_factors)) if item not in exclude
+    ), key=lambda item: item_bias[item] + sum(
+        map(float.__mul__, user_vector, item_factors[item])
+    ))
+
+
+def recommend(factors, reviewed, limit, workers=1):
+    """Лучшие `limit` произведений для каждого пользователя.
+
+    `reviewed[user]` — индексы уже оценённых пользователем произведений,
+    они в рекомендации не попадают. При `workers` > 1 пользователи
+    распределяются между процессами.
+    """
+
+    tasks = (
+        (user_vector, reviewed[user], limit)
+        for user, user_vector in enumerate(factors.user_factors)
+    )
+    item_model = factors.item_factors, factors.item_bias
+    if workers <= 1:
+        _init_item_model(*item_model)
+        return list(map(_recommend, tasks))
+    with Pool(workers, _init_item_model, item_model) as pool:
+        return pool.map(_recommend, tasks, chunksize=256)
@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.constants import SIMILAR_BATCH_SIZE, SIMILAR_TITLES_LIMIT
+from reviews.models import Review, SimilarTitle
+from reviews.similarity import iter_similar_titles
+
+
+class Command(BaseCommand):
+    """Пересчёт похожих произведений по оценкам пользователей."""
+
+    help = (
+        'Строит матрицу оценок пользователь × произведение и сохраняет '
+        'для каждого произведения ближайших соседей по сходству оценок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=SIMILAR_TITLES_LIMIT,
+            help='Сколько соседей хранить для каждого произведения.'
+        )
+
+    def handle(self, *args, **options):
+        rows = Review.objects.visible().order_by('author_id').values_list(
+            'author_id', 'title_id', 'score'
+        ).iterator(chunk_size=SIMILAR_BATCH_SIZE)
+        links = [
+            SimilarTitle(title_id=title_id, similar_id=similar_id, score=score)
+            for title_id, neighbours in iter_similar_titles(
+                rows, options['limit']
+            )
+            for similar_id, score in neighbours
+        ]
+        with transaction.atomic():
+            SimilarTitle.objects.all().delete()
+            SimilarTitle.objects.bulk_create(
+                links, batch_size=SIMILAR_BATCH_SIZE
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено {len(links)} пар похожих произведений.'
+        ))
@@ -3,7 +3,7 @@ import csv
 from django.apps import apps
 from django.core.management import BaseCommand
 
-from reviews.models import Category, User
+from reviews.models import Category, Title, User
 
 
 class Command(BaseCommand):
@@ -53,3 +53,6 @@ class Command(BaseCommand):
                         f'Записи успешно загружены в {model.__name__}.'
                     )
                 )
+
+        Title.objects.update_stats()
+        Title.objects.rebuild_rankings()
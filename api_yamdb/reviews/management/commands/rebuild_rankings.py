@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Полный пересчёт байесовского рейтинга и популярности произведений."""
+
+    help = (
+        'Пересчитывает байесовский рейтинг и популярность всех произведений. '
+        'Рассчитан на периодический запуск по расписанию.'
+    )
+
+    def handle(self, *args, **options):
+        count = Title.objects.rebuild_rankings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинги пересчитаны для {count} произведений.'
+            )
+        )
@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.constants import (
+    RECOMMENDATION_BATCH_SIZE,
+    RECOMMENDATION_EPOCHS,
+    RECOMMENDATION_FACTORS,
+    RECOMMENDATION_LEARNING_RATE,
+    RECOMMENDATION_REGULARIZATION,
+    RECOMMENDATIONS_LIMIT,
+)
+from reviews.factorization import recommend, train_factors
+from reviews.models import Recommendation, Review
+
+
+class Command(BaseCommand):
+    """Обучение рекомендаций по матрице оценок пользователей."""
+
+    help = (
+        'Раскладывает матрицу оценок пользователь × произведение и '
+        'сохраняет для каждого пользователя лучшие неоценённые произведения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--factors', type=int, default=RECOMMENDATION_FACTORS,
+            help='Размерность векторов пользователей и произведений.'
+        )
+        parser.add_argument(
+            '--epochs', type=int, default=RECOMMENDATION_EPOCHS,
+            help='Количество проходов по оценкам.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=RECOMMENDATIONS_LIMIT,
+            help='Сколько произведений рекомендовать каждому пользователю.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество процессов для расчёта рекомендаций.'
+        )
+
+    def handle(self, *args, **options):
+        user_ids, title_ids = {}, {}
+        ratings = []
+        reviewed = defaultdict(set)
+        for author_id, title_id, score in Review.objects.visible().values_list(
+            'author_id', 'title_id', 'score'
+        ).iterator(chunk_size=RECOMMENDATION_BATCH_SIZE):
+            user = user_ids.setdefault(author_id, len(user_ids))
+            item = title_ids.setdefault(title_id, len(title_ids))
+            ratings.append((user, item, score))
+            reviewed[user].add(item)
+        if not ratings:
+            self.stdout.write(self.style.WARNING('Нет оценок для обучения.'))
+            return
+        factors = train_factors(
+            ratings,
+            options['factors'],
+            options['epochs'],
+            RECOMMENDATION_LEARNING_RATE,
+            RECOMMENDATION_REGULARIZATION
+        )
+        titles = list(title_ids)
+        recommendations = recommend(
+            factors, reviewed, options['limit'], options['workers']
+        )
+        with transaction.atomic():
+            Recommendation.objects.all().delete()
+            Recommendation.objects.bulk_create(
+                (
+                    Recommendation(
+                        user_id=user_id,
+                        title_ids=[
+                            titles[item] for item in recommendations[user]
+                        ]
+                    )
+                    for user_id, user in user_ids.items()
+                ),
+                batch_size=RECOMMENDATION_BATCH_SIZE
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендации рассчитаны для {len(user_ids)} пользователей.'
+        ))
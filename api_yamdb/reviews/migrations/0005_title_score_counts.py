@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:35
+
+import reviews.models
+from django.db import migrations, models
+from django.db.models import Count
+
+# Значения на момент миграции: она не должна зависеть от текущего кода.
+MIN_REVIEW_SCORE = 1
+MAX_REVIEW_SCORE = 10
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    score_counts = {
+        pk: [0] * (MAX_REVIEW_SCORE - MIN_REVIEW_SCORE + 1)
+        for pk in Title.objects.values_list('pk', flat=True)
+    }
+    rows = Review.objects.filter(is_hidden=False).order_by().values_list(
+        'title_id', 'score'
+    ).annotate(Count('pk'))
+    for title_id, score, count in rows:
+        score_counts[title_id][score - MIN_REVIEW_SCORE] = count
+    Title.objects.bulk_update(
+        [
+            Title(pk=pk, score_counts=counts)
+            for pk, counts in score_counts.items()
+        ],
+        ('score_counts',)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_hidden_reviews_and_comments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_counts',
+            field=models.JSONField(default=reviews.models.empty_score_counts, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:39
+
+import math
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+from django.db.models import Avg
+
+# Значения и формулы на момент миграции: она не должна зависеть
+# от текущего кода.
+MIN_REVIEW_SCORE = 1
+MAX_REVIEW_SCORE = 10
+RANKING_PRIOR_WEIGHT = 5
+RANKING_BATCH_SIZE = 1000
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TRENDING_HALF_LIFE = 7 * 24 * 60 * 60
+
+
+def get_bayesian_rating(score_counts, prior_mean):
+    count = sum(score_counts)
+    if not count:
+        return None
+    total = sum(
+        score * score_count
+        for score, score_count in enumerate(score_counts, MIN_REVIEW_SCORE)
+    )
+    return (
+        (total + RANKING_PRIOR_WEIGHT * prior_mean)
+        / (count + RANKING_PRIOR_WEIGHT)
+    )
+
+
+def get_trending_weight(moment):
+    return (moment - TRENDING_EPOCH).total_seconds() / TRENDING_HALF_LIFE
+
+
+def add_trending_weight(trending, weight):
+    if trending is None:
+        return weight
+    high, low = max(trending, weight), min(trending, weight)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def fill_rankings(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(is_hidden=False)
+    prior_mean = reviews.aggregate(value=Avg('score'))['value']
+    if prior_mean is None:
+        prior_mean = (MIN_REVIEW_SCORE + MAX_REVIEW_SCORE) / 2
+    trending = dict.fromkeys(Title.objects.values_list('pk', flat=True))
+    for title_id, pub_date in reviews.values_list('title_id', 'pub_date'):
+        trending[title_id] = add_trending_weight(
+            trending[title_id], get_trending_weight(pub_date)
+        )
+    Title.objects.bulk_update(
+        [
+            Title(
+                pk=pk,
+                bayesian=get_bayesian_rating(counts, prior_mean),
+                trending=trending[pk],
+            )
+            for pk, counts in Title.objects.values_list('pk', 'score_counts')
+        ],
+        ('bayesian', 'trending'),
+        batch_size=RANKING_BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_score_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='bayesian',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Байесовский рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='trending',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-bayesian'], name='title_category_bayesian_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-bayesian'], name='title_bayesian_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trending'], name='title_trending_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
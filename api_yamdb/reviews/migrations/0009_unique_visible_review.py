@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_recommendations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_review',
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_hidden', False)), fields=('title', 'author'), name='unique_review', violation_error_message='Вы уже оставили отзыв к этому произведению.'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-19 10:13
+
+from django.db import migrations, models
+from django.db.models import Avg
+
+# Значения на момент миграции: она не должна зависеть от текущего кода.
+MIN_REVIEW_SCORE = 1
+MAX_REVIEW_SCORE = 10
+
+
+def fill_prior_mean(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    RankingPrior = apps.get_model('reviews', 'RankingPrior')
+    prior_mean = Review.objects.filter(is_hidden=False).aggregate(
+        value=Avg('score')
+    )['value']
+    if prior_mean is None:
+        prior_mean = (MIN_REVIEW_SCORE + MAX_REVIEW_SCORE) / 2
+    RankingPrior.objects.create(pk=1, mean=prior_mean)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_unique_visible_review'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Средняя оценка')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Рассчитана')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка',
+                'verbose_name_plural': 'Средняя оценка',
+            },
+        ),
+        migrations.RunPython(fill_prior_mean, migrations.RunPython.noop),
+    ]
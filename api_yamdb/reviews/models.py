@@ -1,14 +1,31 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    FloatField,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, Least, Log, Power
 
 from reviews.constants import (
     DISPLAY_LIMIT,
     MAX_LENGTH_FIELD_NAME,
     MAX_REVIEW_SCORE,
     MIN_REVIEW_SCORE,
+    RANKING_BATCH_SIZE,
 )
 from reviews.core import AbstractNameSlug, AbstractTextPubDateAuthor
+from reviews.rankings import (
+    add_trending_weight,
+    get_bayesian_rating,
+    get_score_totals,
+    get_trending_weight,
+)
 from reviews.validators import year_validator
 
 
@@ -31,6 +48,140 @@ class Genre(AbstractNameSlug):
         verbose_name_plural = 'Жанры'
 
 
+def empty_score_counts():
+    """Нулевые счётчики для каждой допустимой оценки."""
+
+    return [0] * (MAX_REVIEW_SCORE - MIN_REVIEW_SCORE + 1)
+
+
+def get_rating(score_counts):
+    """Средняя оценка, округлённая до целого, по счётчикам оценок."""
+
+    count, total = get_score_totals(score_counts)
+    if not count:
+        return None
+    return (2 * total + count) // (2 * count)
+
+
+def get_prior_mean():
+    """Средняя оценка по всем отзывам для байесовского рейтинга.
+
+    Значение только читается из RankingPrior, куда его записывает
+    rebuild_rankings: запись отзыва не пересчитывает среднюю по всей
+    таблице, а все процессы используют одно и то же значение.
+    """
+
+    prior_mean = RankingPrior.objects.filter(
+        pk=RankingPrior.SINGLETON_ID
+    ).values_list('mean', flat=True).first()
+    if prior_mean is None:
+        return (MIN_REVIEW_SCORE + MAX_REVIEW_SCORE) / 2
+    return prior_mean
+
+
+def set_prior_mean():
+    """Пересчитать среднюю оценку по всем отзывам и сохранить в базе."""
+
+    prior_mean = Review.objects.visible().aggregate(
+        value=Avg('score')
+    )['value']
+    if prior_mean is None:
+        prior_mean = (MIN_REVIEW_SCORE + MAX_REVIEW_SCORE) / 2
+    RankingPrior.objects.update_or_create(
+        pk=RankingPrior.SINGLETON_ID, defaults={'mean': prior_mean}
+    )
+    return prior_mean
+
+
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с пересчётом агрегатов по отзывам."""
+
+    def update_stats(self):
+        """Пересчитать счётчики оценок, рейтинги и число отзывов.
+
+        Счётчики всех выбранных произведений собираются одним GROUP BY
+        и записываются одним bulk_update. Строки произведений блокируются
+        до конца транзакции, а в SQLite транзакция сразу берёт блокировку
+        записи (transaction_mode IMMEDIATE), поэтому параллельные
+        пересчёты выполняются по очереди и не затирают друг друга
+        устаревшими счётчиками.
+        """
+
+        prior_mean = get_prior_mean()
+        with transaction.atomic(using=self.db):
+            locked = self.select_for_update().order_by('pk')
+            score_counts = {
+                pk: empty_score_counts()
+                for pk in locked.values_list('pk', flat=True)
+            }
+            rows = Review.objects.visible().filter(
+                title__in=self.values('pk')
+            ).order_by().values_list('title_id', 'score').annotate(
+                Count('pk')
+            )
+            for title_id, score, count in rows:
+                score_counts[title_id][score - MIN_REVIEW_SCORE] = count
+            return self.model.objects.bulk_update(
+                (
+                    self.model(
+                        pk=pk,
+                        score_counts=counts,
+                        review_count=sum(counts),
+                        rating=get_rating(counts),
+                        bayesian=get_bayesian_rating(counts, prior_mean),
+                    )
+                    for pk, counts in score_counts.items()
+                ),
+                ('score_counts', 'review_count', 'rating', 'bayesian')
+            )
+
+    def add_trending(self, moment):
+        """Учесть в популярности отзыв, оставленный в момент `moment`.
+
+        Веса складываются в логарифмической шкале одним UPDATE без
+        чтения текущего значения.
+        """
+
+        weight = Value(get_trending_weight(moment), FloatField())
+        high = Greatest(F('trending'), weight)
+        low = Least(F('trending'), weight)
+        return self.update(trending=Case(
+            When(trending__isnull=True, then=weight),
+            default=high + Log(
+                Value(2.0), Value(1.0) + Power(Value(2.0), low - high)
+            ),
+        ))
+
+    def rebuild_rankings(self):
+        """Полностью пересчитать байесовский рейтинг и популярность.
+
+        Отзывы читаются одним потоком, веса накапливаются в памяти
+        и записываются пакетами по RANKING_BATCH_SIZE.
+        """
+
+        prior_mean = set_prior_mean()
+        trending = dict.fromkeys(self.values_list('pk', flat=True))
+        rows = Review.objects.visible().filter(
+            title__in=self.values('pk')
+        ).values_list('title_id', 'pub_date')
+        for title_id, pub_date in rows.iterator(chunk_size=RANKING_BATCH_SIZE):
+            trending[title_id] = add_trending_weight(
+                trending[title_id], get_trending_weight(pub_date)
+            )
+        return self.model.objects.bulk_update(
+            (
+                self.model(
+                    pk=pk,
+                    bayesian=get_bayesian_rating(counts, prior_mean),
+                    trending=trending[pk],
+                )
+                for pk, counts in self.values_list('pk', 'score_counts')
+            ),
+            ('bayesian', 'trending'),
+            batch_size=RANKING_BATCH_SIZE
+        )
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -50,14 +201,60 @@ class Title(models.Model):
         'Год выпуска',
         validators=(year_validator,)
     )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_counts = models.JSONField(
+        'Количество оценок',
+        default=empty_score_counts,
+        editable=False
+    )
+    bayesian = models.FloatField(
+        'Байесовский рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    trending = models.FloatField(
+        'Популярность',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(
+                fields=('category', '-bayesian'),
+                name='title_category_bayesian_idx'
+            ),
+            models.Index(fields=('-bayesian',), name='title_bayesian_idx'),
+            models.Index(fields=('-trending',), name='title_trending_idx'),
+        )
 
     def __str__(self):
         return self.name[:DISPLAY_LIMIT]
 
+    def get_score_counts(self):
+        """Количество отзывов с каждой оценкой."""
+
+        return dict(enumerate(self.score_counts, MIN_REVIEW_SCORE))
+
 
 class Review(AbstractTextPubDateAuthor):
     """Модель отзыва на произведение."""
@@ -89,7 +286,11 @@ class Review(AbstractTextPubDateAuthor):
         constraints = (
             models.UniqueConstraint(
                 fields=('title', 'author'),
+                condition=models.Q(is_hidden=False),
                 name='unique_review',
+                violation_error_message=(
+                    'Вы уже оставили отзыв к этому произведению.'
+                ),
             ),
         )
 
@@ -107,3 +308,75 @@ class Comment(AbstractTextPubDateAuthor):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class SimilarTitle(models.Model):
+    """Предрассчитанное сходство двух произведений."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+        verbose_name='Произведение'
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name='Похожее произведение'
+    )
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'similar'),
+                name='unique_similar_title',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('title', '-score'), name='similar_title_score_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.title} ~ {self.similar}'
+
+
+class Recommendation(models.Model):
+    """Предрассчитанные рекомендации произведений пользователю."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendation',
+        verbose_name='Пользователь'
+    )
+    title_ids = models.JSONField('Произведения', default=list)
+    updated_at = models.DateTimeField('Рассчитаны', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Рекомендации'
+        verbose_name_plural = 'Рекомендации'
+
+    def __str__(self):
+        return f'Рекомендации для {self.user}'
+
+
+class RankingPrior(models.Model):
+    """Средняя оценка по всем отзывам: единственная строка таблицы."""
+
+    SINGLETON_ID = 1
+
+    mean = models.FloatField('Средняя оценка')
+    updated_at = models.DateTimeField('Рассчитана', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Средняя оценка'
+        verbose_name_plural = 'Средняя оценка'
+
+    def __str__(self):
+        return f'{self.mean:.2f}'
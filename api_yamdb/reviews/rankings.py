@@ -0,0 +1,54 @@
+import math
+
+from reviews.constants import (
+    MIN_REVIEW_SCORE,
+    RANKING_PRIOR_WEIGHT,
+    TRENDING_EPOCH,
+    TRENDING_HALF_LIFE,
+)
+
+
+def get_score_totals(score_counts):
+    """Число оценок и их сумма по счётчикам оценок."""
+
+    return sum(score_counts), sum(
+        score * score_count
+        for score, score_count in enumerate(score_counts, MIN_REVIEW_SCORE)
+    )
+
+
+def get_bayesian_rating(score_counts, prior_mean):
+    """Байесовский рейтинг: средняя оценка, сглаженная к `prior_mean`.
+
+    Оценки произведения дополняются RANKING_PRIOR_WEIGHT виртуальными
+    оценками, равными средней по всем отзывам, поэтому единственная
+    десятка не поднимает произведение на первое место.
+    """
+
+    count, total = get_score_totals(score_counts)
+    if not count:
+        return None
+    return (
+        (total + RANKING_PRIOR_WEIGHT * prior_mean)
+        / (count + RANKING_PRIOR_WEIGHT)
+    )
+
+
+def get_trending_weight(moment):
+    """Вклад отзыва в популярность в логарифмической шкале.
+
+    Вес отзыва равен 2 ** ((moment - TRENDING_EPOCH) / TRENDING_HALF_LIFE),
+    то есть удваивается каждые TRENDING_HALF_LIFE секунд. Хранится его
+    логарифм по основанию 2, чтобы значения не переполнялись.
+    """
+
+    return (moment - TRENDING_EPOCH).total_seconds() / TRENDING_HALF_LIFE
+
+
+def add_trending_weight(trending, weight):
+    """Сумма весов в логарифмической шкале: log2(2 ** a + 2 ** b)."""
+
+    if trending is None:
+        return weight
+    high, low = max(trending, weight), min(trending, weight)
+    return high + math.log2(1 + 2 ** (low - high))
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+
+
+_deferred_title_ids = ContextVar('deferred_title_ids', default=None)
+
+
+@contextmanager
+def defer_title_stats():
+    """Откладывает пересчёт рейтингов до конца блока.
+
+    Внутри блока затронутые произведения только запоминаются,
+    а на выходе пересчитываются одним UPDATE.
+    """
+
+    title_ids = set()
+    token = _deferred_title_ids.set(title_ids)
+    try:
+        yield title_ids
+        if title_ids:
+            Title.objects.filter(pk__in=title_ids).update_stats()
+    finally:
+        _deferred_title_ids.reset(token)
+
+
+def is_title_deletion(origin):
+    """Удаление начато с произведения или QuerySet произведений."""
+
+    if isinstance(origin, QuerySet):
+        return origin.model is Title
+    return isinstance(origin, Title)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def update_title_stats(sender, instance, origin=None, **kwargs):
+    """Обновление рейтинга произведения при изменении его отзывов.
+
+    Отзывы, удаляемые каскадом вместе с произведением, пропускаются:
+    пересчитывать рейтинг удаляемого произведения незачем.
+    """
+
+    if is_title_deletion(origin):
+        return
+    deferred = _deferred_title_ids.get()
+    if deferred is not None:
+        deferred.add(instance.title_id)
+        return
+    Title.objects.filter(pk=instance.title_id).update_stats()
+
+
+@receiver(post_save, sender=Review)
+def update_title_trending(sender, instance, created, **kwargs):
+    """Учёт нового отзыва в популярности произведения."""
+
+    if created and not instance.is_hidden:
+        Title.objects.filter(pk=instance.title_id).add_trending(
+            instance.pub_date
+        )
@@ -0,0 +1,56 @@
+import heapq
+import math
+from array import array
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+
+def build_score_matrix(rows):
+    """Разреженная матрица оценок пользователь × произведение.
+
+    `rows` — пары (автор, произведение, оценка), упорядоченные по автору.
+    Оценки центрируются по среднему пользователя (adjusted cosine),
+    строки и столбцы хранятся в компактных массивах.
+    """
+
+    by_user = []
+    by_title = defaultdict(lambda: (array('q'), array('d')))
+    for _, user_rows in groupby(rows, key=itemgetter(0)):
+        user_rows = list(user_rows)
+        mean = sum(score for _, _, score in user_rows) / len(user_rows)
+        user = len(by_user)
+        titles, scores = array('q'), array('d')
+        for _, title_id, score in user_rows:
+            titles.append(title_id)
+            scores.append(score - mean)
+            by_title[title_id][0].append(user)
+            by_title[title_id][1].append(score - mean)
+        by_user.append((titles, scores))
+    return by_user, dict(by_title)
+
+
+def iter_similar_titles(rows, limit):
+    """Ближайшие соседи каждого произведения по косинусной мере.
+
+    Сходства считаются построчно: в памяти держится одна строка матрицы
+    сходств, а не вся матрица. Для каждого произведения возвращаются до
+    `limit` соседей с положительным сходством в виде
+    (произведение, [(сосед, сходство), ...]).
+    """
+
+    by_user, by_title = build_score_matrix(rows)
+    norms = {
+        title_id: math.sqrt(sum(score * score for score in scores))
+        for title_id, (_, scores) in by_title.items()
+    }
+    for title_id in sorted(by_title):
+        dots = defaultdict(float)
+        for user, score in zip(*by_title[title_id]):
+            for other_id, other_score in zip(*by_user[user]):
+                dots[other_id] += score * other_score
+        dots.pop(title_id, None)
+        yield title_id, heapq.nlargest(limit, (
+            (other_id, dot / (norms[title_id] * norms[other_id]))
+            for other_id, dot in dots.items() if dot > 0
+        ), key=itemgetter(1))
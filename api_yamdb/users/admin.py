@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from users.models import User
+from users.models import OutboxEmail, User
 
 
 @admin.register(User)
@@ -21,3 +21,14 @@ class UserAdmin(BaseUserAdmin):
     add_fieldsets = BaseUserAdmin.add_fieldsets + (
         ('Extra fields', {'fields': ('bio', 'role')}),
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient', 'subject', 'created_at', 'attempts', 'sent_at',
+        'expires_at'
+    )
+    search_fields = ('recipient',)
+    list_filter = ('sent_at',)
+    exclude = ('body',)
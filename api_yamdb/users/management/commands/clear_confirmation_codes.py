@@ -0,0 +1,42 @@
+import time
+
+from django.core.management import BaseCommand
+
+from reviews.constants import CONFIRMATION_SWEEP_INTERVAL
+from users.models import OutboxEmail, User
+
+
+class Command(BaseCommand):
+    """Удаление истёкших кодов подтверждения и писем с ними."""
+
+    help = (
+        'Стирает истёкшие коды подтверждения одним запросом и удаляет '
+        'истёкшие письма с кодами, отправленные или нет. '
+        'Без --once работает постоянно с паузой --interval.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=CONFIRMATION_SWEEP_INTERVAL,
+            help='Пауза в секундах между проходами.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить один проход и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            cleared = User.objects.clear_expired_codes()
+            if cleared:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Удалено кодов: {cleared}.')
+                )
+            deleted = OutboxEmail.objects.delete_expired()
+            if deleted:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Удалено писем: {deleted}.')
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,65 @@
+import smtplib
+import time
+
+from django.core.mail import get_connection
+from django.core.management import BaseCommand
+
+from reviews.constants import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL
+from users.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди."""
+
+    help = (
+        'Отправляет письма из очереди пачками через одно SMTP-соединение. '
+        'Без --once работает постоянно, опрашивая очередь.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+            help='Сколько писем выбирать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь один раз и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = self.drain(options['batch_size'])
+            if sent:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Отправлено писем: {sent}.')
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        """Разобрать очередь, держа одно соединение на все пачки."""
+
+        if not OutboxEmail.objects.pending().exists():
+            return 0
+        connection = get_connection()
+        try:
+            connection.open()
+        except (smtplib.SMTPException, OSError) as error:
+            self.stderr.write(f'Почтовый сервер недоступен: {error}')
+            return 0
+        sent = 0
+        try:
+            while batch := OutboxEmail.objects.pending()[:batch_size]:
+                sent += batch.deliver(connection)
+        except smtplib.SMTPServerDisconnected as error:
+            self.stderr.write(
+                f'Соединение с почтовым сервером разорвано: {error}'
+            )
+        finally:
+            connection.close()
+        return sent
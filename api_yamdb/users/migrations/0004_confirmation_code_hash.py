@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:09
+
+import users.models
+from django.db import migrations, models
+
+
+def clear_plain_codes(apps, schema_editor):
+    """Открытые коды нельзя сверить с хешем: их нужно запросить заново."""
+
+    User = apps.get_model('users', 'User')
+    User.objects.exclude(confirmation_code=None).update(confirmation_code=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Попыток ввода кода'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_code_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Код подтверждения действует до'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_code',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Хеш кода подтверждения'),
+        ),
+        migrations.RunPython(clear_plain_codes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['confirmation_code_expires_at'], name='user_code_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-19 10:22
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Значения на момент миграции: она не должна зависеть от текущего кода.
+CONFIRMATION_CODE_SUBJECT = 'Код подтверждения'
+CONFIRMATION_CODE_TTL = 15 * 60
+
+
+def expire_code_emails(apps, schema_editor):
+    """Письма с кодами получают срок кода, у отправленных стирается текст."""
+
+    OutboxEmail = apps.get_model('users', 'OutboxEmail')
+    emails = OutboxEmail.objects.filter(subject=CONFIRMATION_CODE_SUBJECT)
+    emails.update(
+        expires_at=F('created_at') + timedelta(seconds=CONFIRMATION_CODE_TTL)
+    )
+    OutboxEmail.objects.exclude(sent_at=None).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_confirmation_code_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Действует до'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['expires_at'], name='outbox_expires_idx'),
+        ),
+        migrations.RunPython(expire_code_emails, migrations.RunPython.noop),
+    ]
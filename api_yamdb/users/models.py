@@ -1,20 +1,94 @@
-from django.contrib.auth.models import AbstractUser
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.mail import EmailMessage
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Least
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
 from django.utils.translation import gettext_lazy as _
 
 from api.validations import validate_username
 from reviews.constants import (
     ADMIN,
+    CONFIRMATION_CODE_SALT,
+    CONFIRMATION_CODE_TTL,
+    CONFIRMATION_HASH_LENGTH,
+    CONFIRMATION_MAX_ATTEMPTS,
     DISPLAY_LIMIT,
     MAX_BIO_LENGHT,
-    MAX_CODE_LENGTH,
     MAX_EMAIL_LENGTH,
+    MAX_LENGTH_FIELD_NAME,
     MAX_NAME_LENGTH,
     MODERATOR,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_DELAY,
+    OUTBOX_RETRY_DELAY,
     USER,
 )
 
 
+def hash_confirmation_code(username, code):
+    """Хеш кода подтверждения, привязанный к имени пользователя."""
+
+    return salted_hmac(
+        CONFIRMATION_CODE_SALT, f'{username}:{code}', algorithm='sha256'
+    ).hexdigest()
+
+
+class UserQuerySet(models.QuerySet):
+    """QuerySet пользователей."""
+
+    def consume_confirmation_code(self, username, code):
+        """Погасить код подтверждения пользователя `username`.
+
+        Код сверяется и гасится одним условным UPDATE, поэтому один код
+        нельзя использовать дважды даже при параллельных запросах.
+        Неверный код увеличивает счётчик попыток. Возвращает True, если
+        код подошёл; если пользователя нет, выбрасывает DoesNotExist.
+
+        Деактивированный администратором пользователь код погасить не
+        может. UPDATE не меняет полей из User.TOKEN_FIELDS, поэтому
+        версия токенов и сигналы сохранения пользователя не затрагиваются.
+        """
+
+        users = self.filter(username=username)
+        if users.filter(
+            is_active=True,
+            confirmation_code=hash_confirmation_code(username, code),
+            confirmation_code_expires_at__gt=timezone.now(),
+            confirmation_attempts__lt=CONFIRMATION_MAX_ATTEMPTS
+        ).update(
+            confirmation_code=None,
+            confirmation_code_expires_at=None,
+            confirmation_attempts=0
+        ):
+            return True
+        if not users.update(confirmation_attempts=Least(
+            F('confirmation_attempts') + 1, CONFIRMATION_MAX_ATTEMPTS
+        )):
+            raise self.model.DoesNotExist
+        return False
+
+    def clear_expired_codes(self):
+        """Стереть истёкшие коды подтверждения одним запросом."""
+
+        return self.filter(
+            confirmation_code_expires_at__lte=timezone.now()
+        ).update(
+            confirmation_code=None,
+            confirmation_code_expires_at=None,
+            confirmation_attempts=0
+        )
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
+    """Менеджер пользователей с методами UserQuerySet."""
+
+
 class User(AbstractUser):
     """Кастомная модель пользователя."""
 
@@ -47,11 +121,20 @@ class User(AbstractUser):
         null=True
     )
     confirmation_code = models.CharField(
-        'Код подтверждения',
-        max_length=MAX_CODE_LENGTH,
+        'Хеш кода подтверждения',
+        max_length=CONFIRMATION_HASH_LENGTH,
+        blank=True,
+        null=True
+    )
+    confirmation_code_expires_at = models.DateTimeField(
+        'Код подтверждения действует до',
         blank=True,
         null=True
     )
+    confirmation_attempts = models.PositiveSmallIntegerField(
+        'Попыток ввода кода',
+        default=0
+    )
     bio = models.CharField(
         'Информация',
         max_length=MAX_BIO_LENGHT,
@@ -64,11 +147,72 @@ class User(AbstractUser):
         unique=True,
         validators=(validate_username,)
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False
+    )
+
+    objects = CustomUserManager()
+
+    TOKEN_FIELDS = ('role', 'is_superuser', 'is_active')
+    CONFIRMATION_FIELDS = (
+        'confirmation_code', 'confirmation_code_expires_at',
+        'confirmation_attempts'
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'пользователи'
         ordering = ('username',)
+        indexes = (
+            models.Index(
+                fields=('confirmation_code_expires_at',),
+                name='user_code_expires_idx'
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._token_state = user.get_token_state()
+        return user
+
+    def get_token_state(self):
+        return tuple(self.__dict__.get(name) for name in self.TOKEN_FIELDS)
+
+    def refresh_token_version(self):
+        """Сменить версию токенов, если изменились права пользователя.
+
+        Выданные ранее токены с прежней версией перестают действовать.
+        Результат сохраняется в `token_version_changed`.
+        """
+
+        state = self.get_token_state()
+        self.token_version_changed = getattr(
+            self, '_token_state', state
+        ) != state
+        if not self.token_version_changed:
+            return False
+        self.token_version += 1
+        self._token_state = state
+        return True
+
+    def set_confirmation_code(self, code):
+        """Сохранить хеш нового кода подтверждения и срок его действия."""
+
+        self.confirmation_code = hash_confirmation_code(self.username, code)
+        self.confirmation_code_expires_at = timezone.now() + timedelta(
+            seconds=CONFIRMATION_CODE_TTL
+        )
+        self.confirmation_attempts = 0
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.refresh_token_version() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_state = self.get_token_state()
 
     @property
     def is_admin(self):
@@ -80,3 +224,115 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username[:DISPLAY_LIMIT]
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    """QuerySet очереди исходящих писем."""
+
+    def pending(self):
+        """Неотправленные и не истёкшие письма, которым пора уйти."""
+
+        now = timezone.now()
+        return self.filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=now),
+            sent_at__isnull=True,
+            attempts__lt=OUTBOX_MAX_ATTEMPTS,
+            next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'pk')
+
+    def delete_expired(self):
+        """Удалить истёкшие письма, отправленные или нет."""
+
+        return self.filter(expires_at__lte=timezone.now()).delete()[0]
+
+    def deliver(self, connection):
+        """Отправить письма через открытое соединение `connection`.
+
+        Неудачные письма откладываются с экспоненциально растущей
+        задержкой. Текст отправленного письма стирается: в нём может
+        быть код подтверждения. При разрыве соединения отправка прерывается
+        с исключением SMTPServerDisconnected, а попытка засчитывается
+        только письму, на котором соединение разорвалось. Результаты
+        сохраняются для всех опробованных писем, даже если отправка
+        прервалась исключением. Возвращает количество отправленных писем.
+        """
+
+        tried = []
+        sent = 0
+        try:
+            for email in self:
+                tried.append(email)
+                try:
+                    connection.send_messages([email.get_message(connection)])
+                except smtplib.SMTPServerDisconnected as error:
+                    email.postpone(error)
+                    raise
+                except (smtplib.SMTPException, OSError) as error:
+                    email.postpone(error)
+                    continue
+                email.sent_at = timezone.now()
+                email.body = ''
+                sent += 1
+        finally:
+            self.model.objects.bulk_update(
+                tried, (
+                    'sent_at', 'body', 'attempts', 'next_attempt_at',
+                    'last_error'
+                )
+            )
+        return sent
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    recipient = models.EmailField('Получатель', max_length=MAX_EMAIL_LENGTH)
+    subject = models.CharField('Тема', max_length=MAX_LENGTH_FIELD_NAME)
+    body = models.TextField('Текст')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Неудачных попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    expires_at = models.DateTimeField(
+        'Действует до',
+        null=True,
+        blank=True
+    )
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outbox_pending_idx'
+            ),
+            models.Index(fields=('expires_at',), name='outbox_expires_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
+
+    def get_message(self, connection):
+        return EmailMessage(
+            self.subject,
+            self.body,
+            settings.DEFAULT_FROM_EMAIL,
+            (self.recipient,),
+            connection=connection
+        )
+
+    def postpone(self, error):
+        """Учесть неудачную попытку и отложить следующую."""
+
+        self.attempts += 1
+        self.last_error = str(error)
+        self.next_attempt_at = timezone.now() + timedelta(seconds=min(
+            OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1), OUTBOX_MAX_DELAY
+        ))
@@ -1,6 +1,10 @@
 import os
 import sys
 
+import pytest
+from django.test import override_settings
+from django.utils.functional import empty
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
@@ -28,4 +32,36 @@ if FILENAME not in project_dir_content:
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_cache',
+    'tests.fixtures.fixture_throttling',
 ]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def shared_memory_files(tmp_path_factory):
+    """Файлы общей памяти тестов во временном каталоге.
+
+    Тесты очищают эти файлы, поэтому они не должны совпадать с файлами
+    запущенного из того же каталога сервера.
+    """
+
+    from api import authentication, throttling
+
+    shared = (
+        authentication.revoked_tokens,
+        throttling.token_buckets,
+        throttling.rate_windows,
+        throttling.rejections,
+    )
+    assert all(lazy._wrapped is empty for lazy in shared), (
+        'Файлы общей памяти открыты до переопределения путей: не '
+        'импортируйте их объекты в модули тестов напрямую.'
+    )
+    directory = tmp_path_factory.mktemp('shared')
+    with override_settings(
+        TOKEN_REVOCATION_FILE=directory / 'revoked_tokens.bloom',
+        THROTTLE_STORE_FILE=directory / 'throttle.buckets',
+        RATE_WINDOW_STORE_FILE=directory / 'throttle.windows',
+        THROTTLE_REJECTIONS_FILE=directory / 'throttle.rejections',
+    ):
+        yield directory
@@ -0,0 +1,13 @@
+import pytest
+
+from api import authentication
+from api.authentication import token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache.clear()
+    authentication.revoked_tokens.clear()
+    yield
+    token_cache.clear()
+    authentication.revoked_tokens.clear()
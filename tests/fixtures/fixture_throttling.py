@@ -0,0 +1,14 @@
+import pytest
+
+from api import throttling
+
+
+@pytest.fixture(autouse=True)
+def clear_throttling():
+    throttling.token_buckets.clear()
+    throttling.rate_windows.clear()
+    throttling.rejections.clear()
+    yield
+    throttling.token_buckets.clear()
+    throttling.rate_windows.clear()
+    throttling.rejections.clear()
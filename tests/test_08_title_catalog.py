@@ -0,0 +1,571 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import similarity
+from reviews.models import RankingPrior, Title
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleCatalogAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_title_facets(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+
+        response = client.get(f'{self.TITLES_URL}?facets=')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?facets=` '
+            'возвращает ответ со статусом 200.'
+        )
+        facets = response.json().get('facets')
+        assert facets == {
+            'genre': {'comedy': 1, 'drama': 1, 'horror': 1},
+            'category': {'books': 1, 'films': 1},
+            'year': {'1980': 2},
+        }, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?facets=` '
+            'возвращает количество произведений по жанрам, категориям и '
+            'десятилетиям.'
+        )
+
+        response = client.get(
+            f'{self.TITLES_URL}?facets=genre&genre={genres[0]["slug"]}'
+        )
+        data = response.json()
+        assert data['count'] == 1
+        assert data['facets'] == {'genre': {'comedy': 1, 'horror': 1}}, (
+            'Проверьте, что фасеты считаются с учётом фильтров запроса.'
+        )
+
+        response = client.get(self.TITLES_URL)
+        assert 'facets' not in response.json(), (
+            'Фасеты должны возвращаться только по параметру `facets`.'
+        )
+
+    def test_02_title_facets_unknown(self, client):
+        response = client.get(f'{self.TITLES_URL}?facets=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запрос неизвестного фасета возвращает ответ со '
+            'статусом 400.'
+        )
+
+    def test_03_title_multi_genre_filter(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+
+        response = client.get(
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]},{genres[2]["slug"]}'
+        )
+        assert response.json()['count'] == 2, (
+            'Проверьте, что фильтр `genre` со списком жанров возвращает '
+            'произведения хотя бы с одним из них.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]},{genres[1]["slug"]}'
+        )
+        assert response.json()['count'] == 1, (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'не дублируется в выдаче.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]},{genres[2]["slug"]}'
+            '&genre_match=all'
+        )
+        assert response.json()['count'] == 0, (
+            'Проверьте, что при `genre_match=all` возвращаются только '
+            'произведения со всеми перечисленными жанрами.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]},{genres[1]["slug"]}'
+            '&genre_match=all'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ]
+
+    def test_04_title_range_filters(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'Отлично', 9)
+
+        response = client.get(f'{self.TITLES_URL}?year_min=1985')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], 'Проверьте работу фильтра `year_min`.'
+        response = client.get(f'{self.TITLES_URL}?year_max=1985')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], 'Проверьте работу фильтра `year_max`.'
+        response = client.get(
+            f'{self.TITLES_URL}?rating_min=8&rating_max=10'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], 'Проверьте работу фильтров `rating_min` и `rating_max`.'
+
+    def test_05_title_rating_kept_in_sync(self, client, admin_client,
+                                         user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Неплохо', 6
+        ).json()
+        create_single_review(moderator_client, titles[0]['id'], 'Слабо', 3)
+        assert client.get(url).json()['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается после '
+            'добавления отзыва.'
+        )
+
+        user_client.patch(
+            f'{url}reviews/{review["id"]}/', data={'score': 10}
+        )
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается после '
+            'изменения оценки.'
+        )
+
+        user_client.delete(f'{url}reviews/{review["id"]}/')
+        assert client.get(url).json()['rating'] == 3, (
+            'Проверьте, что рейтинг произведения пересчитывается после '
+            'удаления отзыва.'
+        )
+
+    def test_06_sparse_fields(self, client, admin_client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.TITLES_URL}?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        assert [set(title) for title in response.json()['results']] == [
+            {'id', 'name', 'rating'}
+        ] * len(titles), (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля, а жанры при этом не запрашиваются.'
+        )
+
+        response = client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=genre'
+        )
+        assert response.json() == {'genre': [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+        ]}
+
+        response = client.get('/api/v1/categories/?fields=slug')
+        assert response.json()['results'] == [
+            {'slug': 'books'}, {'slug': 'films'}
+        ]
+
+        response = client.get(f'{self.TITLES_URL}?fields=id,author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запрос неизвестного поля в `fields` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_07_sparse_fields_users(self, admin_client, admin):
+        response = admin_client.get('/api/v1/users/?fields=username,role')
+        assert response.json()['results'] == [
+            {'username': admin.username, 'role': admin.role}
+        ]
+        response = admin_client.get('/api/v1/users/me/?fields=email')
+        assert response.json() == {'email': admin.email}
+
+    def test_08_expand_reviews_and_comments(self, client, admin_client,
+                                            user_client, moderator_client,
+                                            django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 8
+        ).json()
+        create_single_review(moderator_client, titles[1]['id'], 'Отзыв', 4)
+        create_single_comment(
+            moderator_client, titles[0]['id'], review['id'], 'Комментарий'
+        )
+
+        with django_assert_num_queries(5):
+            response = client.get(
+                f'{self.TITLES_URL}?expand=reviews,reviews.comments'
+            )
+        assert response.status_code == HTTPStatus.OK
+        results = {
+            title['id']: title for title in response.json()['results']
+        }
+        title_reviews = results[titles[0]['id']]['reviews']
+        assert [item['id'] for item in title_reviews] == [review['id']], (
+            'Проверьте, что `expand=reviews` встраивает отзывы в ответ.'
+        )
+        assert [
+            comment['text'] for comment in title_reviews[0]['comments']
+        ] == ['Комментарий'], (
+            'Проверьте, что `expand=reviews.comments` встраивает '
+            'комментарии к отзывам.'
+        )
+
+        response = client.get(
+            f'{self.TITLES_URL}{titles[1]["id"]}/?expand=reviews'
+        )
+        data = response.json()
+        assert len(data['reviews']) == 1
+        assert 'comments' not in data['reviews'][0]
+
+        response = client.get(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        assert 'reviews' not in response.json()
+
+        response = client.get(f'{self.TITLES_URL}?expand=comments')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_09_titles_by_ids(self, client, admin_client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        ids = [titles[1]['id'], 999, titles[0]['id']]
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'{self.TITLES_URL}?ids={",".join(map(str, ids))}'
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            'Проверьте, что `ids` возвращает произведения в запрошенном '
+            'порядке.'
+        )
+        assert data['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        assert data['missing'] == [999], (
+            'Проверьте, что отсутствующие id перечислены в `missing`.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?ids=1,a')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        for ids in ('99999999999999999999999', '0', '-1'):
+            response = client.get(f'{self.TITLES_URL}?ids={ids}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что id вне диапазона от 1 до 2 ** 63 - 1 '
+                'возвращают ответ со статусом 400.'
+            )
+        response = client.get(
+            f'{self.TITLES_URL}?ids={",".join(map(str, range(1, 102)))}'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_10_title_page(self, client, admin_client, user_client,
+                           moderator_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 8
+        ).json()
+        create_single_review(moderator_client, titles[0]['id'], 'Отзыв', 3)
+        for text in ('Первый', 'Второй'):
+            create_single_comment(
+                moderator_client, titles[0]['id'], review['id'], text
+            )
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/page/'
+
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert data['title']['id'] == titles[0]['id']
+        assert data['title']['rating'] == 6
+        assert data['scores'] == {
+            str(score): int(score in (3, 8)) for score in range(1, 11)
+        }, 'Проверьте, что страница содержит распределение оценок.'
+        assert data['reviews']['count'] == 2
+        assert data['reviews']['next'] is None
+        comment_counts = {
+            item['id']: item['comment_count']
+            for item in data['reviews']['results']
+        }
+        assert comment_counts[review['id']] == 2, (
+            'Проверьте, что отзывы на странице содержат число комментариев.'
+        )
+
+    def test_11_title_scores(self, client, admin_client, user_client,
+                             moderator_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 8
+        ).json()
+        create_single_review(moderator_client, titles[0]['id'], 'Отзыв', 3)
+        user_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        expected = {
+            str(score): int(score in (3, 10)) for score in range(1, 11)
+        }
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/scores/'
+
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == {
+            'id': titles[0]['id'], 'review_count': 2, 'scores': expected
+        }, (
+            'Проверьте, что распределение оценок обновляется при изменении '
+            'отзыва.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert 'scores' not in response.json(), (
+            'Поле `scores` должно выводиться только по запросу в `fields`.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=id,scores'
+        )
+        assert response.json() == {'id': titles[0]['id'], 'scores': expected}
+
+        user_client.delete(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/{review["id"]}/'
+        )
+        response = client.get(url)
+        assert response.json()['scores']['10'] == 0, (
+            'Проверьте, что распределение оценок обновляется после удаления '
+            'отзыва.'
+        )
+        assert client.get(
+            f'{self.TITLES_URL}999/scores/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_12_title_rankings(self, client, admin_client, user_client,
+                               moderator_client):
+        titles, categories, genres = create_titles(admin_client)
+        titles.append(admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[1]['slug']],
+            'category': categories[0]['slug'],
+        }).json())
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 10)
+        for author_client in (user_client, moderator_client, admin_client):
+            create_single_review(
+                author_client, titles[1]['id'], 'Отлично', 9
+            )
+        for author_client in (moderator_client, admin_client):
+            create_single_review(author_client, titles[2]['id'], 'Плохо', 1)
+
+        response = client.get(f'{self.TITLES_URL}trending/')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}trending/` '
+            'возвращает ответ со статусом 200.'
+        )
+        trending = [title['id'] for title in response.json()['results']]
+        assert trending == [
+            titles[1]['id'], titles[2]['id'], titles[0]['id']
+        ], (
+            'Проверьте, что популярность произведения обновляется при '
+            'добавлении отзыва.'
+        )
+
+        call_command('rebuild_rankings')
+        response = client.get(f'{self.TITLES_URL}top/')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}top/` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[0]['id'], titles[2]['id']
+        ], (
+            'Проверьте, что единственная высокая оценка не поднимает '
+            'произведение выше произведения с многими высокими оценками.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}top/?category={categories[0]["slug"]}'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id'], titles[2]['id']
+        ], 'Проверьте, что рейтинг можно отфильтровать по категории.'
+        response = client.get(f'{self.TITLES_URL}trending/')
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == trending, (
+            'Проверьте, что полный пересчёт популярности совпадает с '
+            'инкрементальным.'
+        )
+
+    def test_13_similar_titles(self, client, admin_client, user_client,
+                               moderator_client, django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        titles.append(admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[1]['slug']],
+            'category': categories[0]['slug'],
+        }).json())
+        scores = {
+            user_client: (10, 9, 1),
+            moderator_client: (9, 10, 2),
+            admin_client: (2, None, 9),
+        }
+        for author_client, title_scores in scores.items():
+            for title, score in zip(titles, title_scores):
+                if score is not None:
+                    create_single_review(
+                        author_client, title['id'], 'Отзыв', score
+                    )
+        call_command('build_similar_titles')
+
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/similar/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [titles[1]['id']], (
+            'Проверьте, что похожими считаются произведения, которые '
+            'пользователи оценили похоже.'
+        )
+        assert 0 < results[0]['similarity'] <= 1
+        assert results[0]['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+
+        response = client.get(f'{self.TITLES_URL}{titles[2]["id"]}/similar/')
+        assert response.json() == {'results': []}
+        response = client.get(f'{self.TITLES_URL}999/similar/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_14_recommendations(self, client, admin_client, user_client,
+                                moderator_client, django_assert_num_queries):
+        url = '/api/v1/users/me/recommendations/'
+        titles, categories, genres = create_titles(admin_client)
+        titles.append(admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[1]['slug']],
+            'category': categories[0]['slug'],
+        }).json())
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 9)
+        for author_client in (moderator_client, admin_client):
+            for title, score in zip(titles, (9, 8, 3)):
+                create_single_review(
+                    author_client, title['id'], 'Отзыв', score
+                )
+
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[2]['id']
+        ], (
+            'Проверьте, что до расчёта рекомендаций пользователю '
+            'предлагаются лучшие неоценённые им произведения.'
+        )
+
+        call_command('train_recommendations', workers=2)
+        with django_assert_num_queries(3):
+            response = user_client.get(url)
+        recommended = [title['id'] for title in response.json()['results']]
+        assert sorted(recommended) == sorted([
+            titles[1]['id'], titles[2]['id']
+        ]), (
+            'Проверьте, что рекомендации содержат только произведения, '
+            'которые пользователь ещё не оценил.'
+        )
+        assert 'scores' not in response.json()['results'][0]
+
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 8)
+        response = user_client.get(url)
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[2]['id']
+        ], 'Проверьте, что оценённые произведения исключаются из выдачи.'
+
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_15_sparse_fields_reviews(
+            self, client, admin_client, user_client,
+            django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        comment = create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'Комментарий'
+        ).json()
+        for list_url, obj in (
+            (url, review), (f'{url}{review["id"]}/comments/', comment)
+        ):
+            with django_assert_num_queries(3) as context:
+                response = client.get(f'{list_url}?fields=id')
+            assert response.json()['results'] == [{'id': obj['id']}]
+            sql = context.captured_queries[-1]['sql']
+            assert 'users_user' not in sql and '"text"' not in sql, (
+                f'Проверьте, что `{list_url}?fields=id` не запрашивает '
+                'текст и автора.'
+            )
+
+    def test_16_prior_mean_off_write_path(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        RankingPrior.objects.all().delete()
+        with CaptureQueriesContext(connection) as context:
+            create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        assert not any(
+            'AVG(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что добавление отзыва не пересчитывает среднюю '
+            'оценку по всем отзывам.'
+        )
+        assert not RankingPrior.objects.exists(), (
+            'Проверьте, что средняя оценка не сохраняется при записи отзыва.'
+        )
+
+        call_command('rebuild_rankings')
+        assert RankingPrior.objects.get().mean == 8, (
+            'Проверьте, что `rebuild_rankings` сохраняет среднюю оценку '
+            'по всем отзывам в базе, общей для всех процессов.'
+        )
+        create_single_review(admin_client, titles[1]['id'], 'Отзыв', 8)
+        assert Title.objects.get(pk=titles[1]['id']).bayesian == 8, (
+            'Проверьте, что пересчёт рейтинга при записи отзыва использует '
+            'сохранённую среднюю оценку.'
+        )
+
+    def test_17_similar_titles_outside_transaction(self, admin_client,
+                                                   user_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'Отзыв', 5)
+        module = 'reviews.management.commands.build_similar_titles'
+        iter_similar_titles = similarity.iter_similar_titles
+
+        def check_transaction(*args, **kwargs):
+            for item in iter_similar_titles(*args, **kwargs):
+                assert not connection.in_atomic_block, (
+                    'Проверьте, что похожие произведения рассчитываются '
+                    'до открытия транзакции.'
+                )
+                yield item
+
+        monkeypatch.setattr(
+            f'{module}.iter_similar_titles', check_transaction
+        )
+        call_command('build_similar_titles')
+
+    def test_18_update_stats_takes_write_lock(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            Title.objects.filter(pk=titles[0]['id']).update_stats()
+        sql = [query['sql'] for query in context.captured_queries]
+        assert sql[1] == 'BEGIN IMMEDIATE', (
+            'Проверьте, что пересчёт рейтинга в SQLite сразу берёт '
+            'блокировку записи, а не повышает её после чтения.'
+        )
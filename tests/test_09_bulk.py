@@ -0,0 +1,299 @@
+import io
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_categories, create_comments, create_genre, create_single_comment,
+    create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09BulkAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_bulk_title_create(self, admin_client,
+                                  django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Произведение {number}',
+                'year': 2000 + number,
+                'genre': [genres[0]['slug'], genres[number % 2 + 1]['slug']],
+                'category': categories[number % 2]['slug'],
+            }
+            for number in range(20)
+        ]
+
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(
+                self.TITLES_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.TITLES_URL}` '
+            'со списком корректных произведений возвращает ответ со '
+            'статусом 201.'
+        )
+        created = response.json()
+        assert [title['name'] for title in created] == [
+            item['name'] for item in data
+        ], 'Проверьте, что созданные произведения возвращаются по порядку.'
+        assert len(created[1]['genre']) == 2
+        assert created[1]['category'] == categories[1]
+        assert admin_client.get(self.TITLES_URL).json()['count'] == 20
+
+    def test_02_bulk_title_create_errors(self, admin_client, user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': 'Корректное',
+                'year': 2000,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            },
+            {
+                'name': 'С неизвестным жанром',
+                'year': 2000,
+                'genre': ['unknown'],
+                'category': categories[0]['slug'],
+            },
+        ]
+
+        response = user_client.post(self.TITLES_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.post(
+            self.TITLES_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакет с некорректным элементом возвращает ответ '
+            'со статусом 400.'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'genre' in errors[1], (
+            'Проверьте, что ошибки возвращаются для каждого элемента пакета.'
+        )
+        assert admin_client.get(self.TITLES_URL).json()['count'] == 0, (
+            'Пакет с ошибками не должен создавать произведения.'
+        )
+
+    def test_03_bulk_moderation_reviews(self, admin_client, user_client,
+                                        moderator_client, user,
+                                        django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        reviews = [
+            create_single_review(user_client, title['id'], 'Спам', 10).json()
+            for title in titles
+        ]
+        create_single_review(moderator_client, titles[0]['id'], 'Ок', 4)
+        create_single_comment(
+            moderator_client, titles[0]['id'], reviews[0]['id'], 'Ответ'
+        )
+        url = '/api/v1/moderation/reviews/'
+
+        response = user_client.post(
+            url, data={'action': 'delete', 'author': user.username},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая модерация недоступна пользователю.'
+        )
+
+        response = moderator_client.post(
+            url, data={'action': 'hide', 'ids': [reviews[0]['id']]},
+            format='json'
+        )
+        assert response.json() == {'reviews': 1}
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert admin_client.get(title_url).json()['rating'] == 4, (
+            'Проверьте, что скрытые отзывы не учитываются в рейтинге.'
+        )
+        assert admin_client.get(
+            f'{title_url}reviews/'
+        ).json()['count'] == 1, (
+            'Проверьте, что скрытые отзывы не выводятся в списке.'
+        )
+
+        with django_assert_max_num_queries(12):
+            response = moderator_client.post(
+                url, data={'action': 'delete', 'author': user.username},
+                format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'reviews': 2, 'comments': 1}, (
+            'Проверьте, что ответ содержит количество удалённых отзывов и '
+            'комментариев.'
+        )
+        second_title = admin_client.get(
+            f'{self.TITLES_URL}{titles[1]["id"]}/'
+        ).json()
+        assert second_title['rating'] is None
+
+    def test_04_bulk_moderation_comments(self, admin_client, user_client,
+                                         moderator_client, user):
+        comments, _, _ = create_comments(admin_client, {user: user_client})
+        url = '/api/v1/moderation/comments/'
+
+        response = moderator_client.post(url, data={'action': 'hide'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = admin_client.post(
+            url, data={'action': 'delete', 'ids': [comments[0]['id']]},
+            format='json'
+        )
+        assert response.json() == {'comments': 1}
+
+    def test_05_bulk_users(self, admin_client, user_client, user,
+                           django_assert_max_num_queries):
+        url = '/api/v1/users/'
+        data = [
+            {'username': 'first', 'email': 'first@yamdb.fake'},
+            {'username': 'second', 'email': 'second@yamdb.fake',
+             'role': 'moderator'},
+            {'username': 'first', 'email': 'other@yamdb.fake'},
+            {'username': 'third', 'email': user.email},
+            {'username': 'me', 'email': 'me@yamdb.fake'},
+            {'username': user.username, 'email': user.email, 'bio': 'new'},
+        ]
+
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        with django_assert_max_num_queries(6):
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        result = response.json()
+        assert result['created'] == ['first', 'second'], (
+            'Проверьте, что пакетная загрузка создаёт корректных '
+            'пользователей.'
+        )
+        assert result['updated'] == []
+        assert [error['row'] for error in result['errors']] == [2, 3, 4, 5], (
+            'Проверьте, что конфликтующие строки перечислены в `errors`.'
+        )
+
+        response = admin_client.post(
+            f'{url}?upsert=true', data=data[-1:], format='json'
+        )
+        assert response.json()['updated'] == [user.username]
+        user.refresh_from_db()
+        assert user.bio == 'new'
+
+        csv_file = io.BytesIO(
+            b'username,email,role\ncsv_user,csv@yamdb.fake,admin\n'
+        )
+        csv_file.name = 'users.csv'
+        response = admin_client.post(
+            url, data={'file': csv_file}, format='multipart'
+        )
+        assert response.json()['created'] == ['csv_user'], (
+            'Проверьте загрузку пользователей из CSV-файла.'
+        )
+        response = admin_client.get(f'{url}csv_user/')
+        assert response.json()['role'] == 'admin'
+
+    def test_06_title_delete_with_reviews(self, admin_client, user_client,
+                                          moderator_client,
+                                          django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for author_client in (user_client, moderator_client, admin_client):
+            create_single_review(
+                author_client, titles[0]['id'], 'Отзыв', 5
+            )
+
+        with django_assert_max_num_queries(10):
+            response = admin_client.delete(
+                f'{self.TITLES_URL}{titles[0]["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что удаление произведения не пересчитывает рейтинг '
+            'после удаления каждого из его отзывов.'
+        )
+
+    def test_07_review_after_hidden(self, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        hidden = create_single_review(
+            user_client, titles[0]['id'], 'Спам', 10
+        ).json()
+        url = '/api/v1/moderation/reviews/'
+        moderator_client.post(
+            url, data={'action': 'hide', 'ids': [hidden['id']]},
+            format='json'
+        )
+
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 6
+        ).json()
+        response = moderator_client.post(
+            url, data={'action': 'show', 'ids': [hidden['id']]},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'reviews': 0}, (
+            'Проверьте, что скрытый отзыв не возвращается, если у автора '
+            'уже есть видимый отзыв на это произведение.'
+        )
+        response = admin_client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            review['id']
+        ]
+        assert admin_client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/'
+        ).json()['rating'] == 6
+
+    def test_08_bulk_title_create_invalid_slugs(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        item = {
+            'name': 'Произведение',
+            'year': 2000,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        }
+        for invalid in (
+            {'category': ['a']},
+            {'category': {'slug': 'a'}},
+            {'genre': [{'slug': 'a'}]},
+            {'genre': [['a']]},
+        ):
+            response = admin_client.post(
+                self.TITLES_URL, data=[{**item, **invalid}], format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пакет с некорректными slug категории или '
+                'жанра возвращает ответ со статусом 400.'
+            )
+            assert set(invalid) <= set(response.json()[0])
+
+        response = admin_client.post(
+            self.TITLES_URL, data=[item] * 1001, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что слишком большой пакет отклоняется.'
+        )
+
+    def test_09_bulk_users_csv_limit(self, admin_client):
+        rows = b''.join(
+            f'csv{number},csv{number}@yamdb.fake\n'.encode()
+            for number in range(3000)
+        )
+        csv_file = io.BytesIO(b'username,email\n' + rows + b'\xff\xfe')
+        csv_file.name = 'users.csv'
+        response = admin_client.post(
+            '/api/v1/users/', data={'file': csv_file}, format='multipart'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == [
+            'Можно загрузить не более 1000 пользователей.'
+        ], (
+            'Проверьте, что CSV-файл отклоняется, как только в нём '
+            'оказывается больше строк, чем допускает лимит, без чтения '
+            'остатка файла.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from itertools import chain, repeat
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10BatchAPI:
+
+    BATCH_URL = '/api/v1/batch/'
+
+    def test_01_batch_requests(self, admin_client, user_client, user,
+                               django_assert_num_queries):
+        create_titles(admin_client)
+        data = {'requests': [
+            {'url': '/api/v1/categories/'},
+            {'url': '/api/v1/genres/?search=Драма'},
+            {'url': '/api/v1/users/me/'},
+            {'url': '/api/v1/unknown/'},
+        ]}
+
+        with django_assert_num_queries(5):
+            response = user_client.post(
+                self.BATCH_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.BATCH_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        categories, genres, me, unknown = response.json()
+        assert categories['status'] == HTTPStatus.OK
+        assert categories['body']['count'] == 2
+        assert genres['body']['results'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ], 'Проверьте, что параметры подзапроса передаются в представление.'
+        assert me['body']['username'] == user.username, (
+            'Проверьте, что подзапросы выполняются от имени пользователя '
+            'пакетного запроса.'
+        )
+        assert unknown['status'] == HTTPStatus.NOT_FOUND
+
+    def test_02_batch_validation(self):
+        client = APIClient()
+        response = client.post(
+            self.BATCH_URL,
+            data={'requests': [{'url': '/api/v1/users/me/'}]},
+            format='json'
+        )
+        assert response.json()[0]['status'] == HTTPStatus.UNAUTHORIZED
+
+        invalid_requests = (
+            [],
+            [{'method': 'DELETE', 'url': '/api/v1/genres/horror/'}],
+            [{'url': '/admin/'}],
+            [{'url': '/api/v1/genres/'}] * 21,
+        )
+        for requests in invalid_requests:
+            response = client.post(
+                self.BATCH_URL, data={'requests': requests}, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что некорректный пакет запросов возвращает ответ '
+                'со статусом 400.'
+            )
+
+    def test_03_batch_deadline(self, user_client, monkeypatch):
+        clock = chain((0, 0), repeat(100))
+        monkeypatch.setattr('api.views.time.monotonic', lambda: next(clock))
+        data = {'requests': [
+            {'url': '/api/v1/categories/'},
+            {'url': '/api/v1/genres/'},
+            {'url': '/api/v1/users/me/'},
+        ]}
+        response = user_client.post(self.BATCH_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        categories, *skipped = response.json()
+        assert categories['status'] == HTTPStatus.OK
+        assert 'skipped' not in categories
+        for sub_response in skipped:
+            assert sub_response['status'] == HTTPStatus.GATEWAY_TIMEOUT
+            assert sub_response['skipped'] is True, (
+                'Проверьте, что подзапросы, не выполненные из-за истечения '
+                'времени пакета, помечаются `skipped`.'
+            )
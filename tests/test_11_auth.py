@@ -0,0 +1,259 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import authentication
+from api.authentication import token_cache
+from api.shared import SharedBloomFilter
+
+from reviews.constants import CONFIRMATION_MAX_ATTEMPTS
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TokenClaimsAPI:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+    USERS_URL = '/api/v1/users/'
+
+    def get_client(self, user):
+        user.set_confirmation_code('123456')
+        user.save()
+        response = APIClient().post(self.TOKEN_URL, data={
+            'username': user.username, 'confirmation_code': '123456'
+        })
+        assert response.status_code == HTTPStatus.OK
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}'
+        )
+        return client
+
+    def test_01_permissions_from_token(self, user, admin, admin_client,
+                                       django_assert_num_queries):
+        user_client = self.get_client(user)
+        with django_assert_num_queries(0):
+            response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что права обычного пользователя проверяются по '
+            'токену без запроса к базе.'
+        )
+
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        assert review['author'] == user.username
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+
+        admin_claims_client = self.get_client(admin)
+        with django_assert_num_queries(3):
+            response = admin_claims_client.get(
+                f'{self.USERS_URL}?fields=username'
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что роль администратора из токена сверяется с '
+            'базой данных.'
+        )
+
+    def test_02_role_change_revokes_token(self, admin):
+        admin_client = self.get_client(admin)
+        assert admin_client.get(self.USERS_URL).status_code == HTTPStatus.OK
+
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли выданные ранее токены '
+            'перестают действовать.'
+        )
+        assert self.get_client(admin).get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_token_cache(self, admin, user, django_assert_num_queries):
+        admin_client = self.get_client(admin)
+        admin_client.get(self.USERS_URL)
+        hits = token_cache.hits
+        with django_assert_num_queries(2):
+            response = admin_client.get(f'{self.USERS_URL}?fields=username')
+        assert response.status_code == HTTPStatus.OK
+        assert token_cache.hits == hits + 2, (
+            'Проверьте, что повторный запрос с тем же токеном берёт '
+            'проверенный токен и пользователя из кеша.'
+        )
+
+        admin.role = 'moderator'
+        admin.save()
+        assert admin_client.get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение пользователя сбрасывает кеш токенов.'
+        )
+
+        user_client = self.get_client(user)
+        user_client.get('/api/v1/users/me/')
+        user.delete()
+        assert user_client.get(
+            '/api/v1/users/me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удаление пользователя сбрасывает кеш токенов.'
+        )
+
+    def test_04_revoked_tokens(self, user, admin_client,
+                               django_assert_num_queries):
+        user_client = self.get_client(user)
+        with django_assert_num_queries(0):
+            assert user_client.get(
+                self.USERS_URL
+            ).status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        revoked_tokens = authentication.revoked_tokens
+        other_worker = SharedBloomFilter(
+            revoked_tokens.path, revoked_tokens.size, revoked_tokens.hashes,
+            revoked_tokens.period
+        )
+        assert f'{user.pk}:{user.token_version}' in other_worker, (
+            'Проверьте, что отзыв токенов виден другим процессам сервера.'
+        )
+        assert user_client.get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токены удалённого пользователя отзываются.'
+        )
+
+    def test_05_signup_queries(self, client, django_assert_num_queries):
+        data = {'email': 'new_user@yamdb.fake', 'username': 'new_user'}
+        # Проверка, запись пользователя и письма, BEGIN и COMMIT.
+        with django_assert_num_queries(5):
+            response = client.post(self.SIGNUP_URL, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что регистрация нового пользователя проверяет '
+            'уникальность одним запросом и создаёт его одной записью.'
+        )
+        with django_assert_num_queries(5):
+            response = client.post(self.SIGNUP_URL, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторная регистрация обновляет код '
+            'подтверждения одним запросом.'
+        )
+        with django_assert_num_queries(1):
+            response = client.post(self.SIGNUP_URL, data={
+                'email': 'other@yamdb.fake', 'username': 'new_user'
+            })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что конфликт username и email выявляется одним '
+            'запросом.'
+        )
+
+    def test_06_confirmation_code_consumed(self, client, django_user_model,
+                                          django_assert_num_queries):
+        data = {'email': 'new_user@yamdb.fake', 'username': 'new_user'}
+        client.post(self.SIGNUP_URL, data=data)
+        call_command('send_outbox', once=True)
+        code = re.search(r'\d+', mail.outbox[-1].body).group()
+        user = django_user_model.objects.get(username=data['username'])
+        assert code not in user.confirmation_code, (
+            'Проверьте, что код подтверждения хранится в базе в виде хеша.'
+        )
+        assert user.confirmation_code_expires_at > timezone.now()
+
+        token_data = {'username': data['username'], 'confirmation_code': code}
+        with django_assert_num_queries(2):
+            response = client.post(self.TOKEN_URL, data=token_data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код гасится условным UPDATE, а для токена '
+            'загружается только строка пользователя.'
+        )
+        response = client.post(self.TOKEN_URL, data=token_data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя использовать дважды.'
+        )
+
+    def test_07_confirmation_code_limits(self, client, user):
+        token_data = {'username': user.username, 'confirmation_code': '123456'}
+        user.set_confirmation_code('123456')
+        user.save()
+        for _ in range(CONFIRMATION_MAX_ATTEMPTS):
+            client.post(self.TOKEN_URL, data={
+                'username': user.username, 'confirmation_code': '000000'
+            })
+        response = client.post(self.TOKEN_URL, data=token_data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что после исчерпания попыток код не принимается.'
+        )
+
+        user.set_confirmation_code('123456')
+        user.confirmation_code_expires_at = timezone.now() - timedelta(
+            seconds=1
+        )
+        user.save()
+        response = client.post(self.TOKEN_URL, data=token_data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что истёкший код не принимается.'
+        )
+        call_command('clear_confirmation_codes', once=True)
+        user.refresh_from_db()
+        assert user.confirmation_code is None, (
+            'Проверьте, что команда `clear_confirmation_codes` стирает '
+            'истёкшие коды.'
+        )
+
+    def test_08_revocation_filter_rotation(self, user, tmp_path,
+                                           monkeypatch):
+        revoked_tokens = authentication.revoked_tokens
+        user.bio = 'Новая информация'
+        user.save()
+        assert f'{user.pk}:{user.token_version}' not in revoked_tokens, (
+            'Проверьте, что токены отзываются, только если сменилась '
+            'версия токенов пользователя.'
+        )
+        user.role = 'moderator'
+        user.save()
+        assert f'{user.pk}:{user.token_version - 1}' in revoked_tokens
+
+        bloom = SharedBloomFilter(tmp_path / 'bloom', 1024, 3, 60)
+        now = 60 * 1000
+        monkeypatch.setattr('api.shared.time.time', lambda: now)
+        bloom.add('key')
+        now += 60
+        assert 'key' in bloom, (
+            'Проверьте, что отозванный ключ виден в течение следующего '
+            'периода фильтра.'
+        )
+        bloom.add('other')
+        now += 60
+        assert 'key' not in bloom, (
+            'Проверьте, что поколения фильтра отзыва сменяются со сроком '
+            'жизни токена доступа.'
+        )
+        assert 'other' in bloom
+
+    def test_09_confirmation_code_inactive_user(self, client, user):
+        user.is_active = False
+        user.set_confirmation_code('123456')
+        user.save()
+        token_version = user.token_version
+        response = client.post(self.TOKEN_URL, data={
+            'username': user.username, 'confirmation_code': '123456'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что деактивированный пользователь не может '
+            'получить токен по коду подтверждения.'
+        )
+        user.refresh_from_db()
+        assert not user.is_active, (
+            'Проверьте, что код подтверждения не активирует пользователя, '
+            'деактивированного администратором.'
+        )
+        assert user.token_version == token_version
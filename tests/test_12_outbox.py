@@ -0,0 +1,139 @@
+import smtplib
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('Соединение разорвано')
+
+
+class CrashingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        if getattr(self, 'crash', False):
+            raise RuntimeError('Сбой')
+        self.crash = True
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12OutboxAPI:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client):
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        outbox_before_count = len(mail.outbox)
+
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что регистрация не отправляет письмо синхронно.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == data['email']
+        assert email.sent_at is None
+
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox` отправляет письма из '
+            'очереди.'
+        )
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_failed_email_retried_with_backoff(self, client, settings):
+        outbox_before_count = len(mail.outbox)
+        client.post(
+            self.URL_SIGNUP,
+            data={'email': 'retry@yamdb.fake', 'username': 'retry'}
+        )
+        settings.EMAIL_BACKEND = 'tests.test_12_outbox.FailingEmailBackend'
+        call_command('send_outbox', once=True)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неудачная отправка откладывается.'
+        )
+        assert 'Соединение разорвано' in email.last_error
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока.'
+        )
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    def test_03_delivery_interrupted(self, settings):
+        emails = [
+            OutboxEmail.objects.create(
+                recipient=f'user{number}@yamdb.fake', subject='Тема',
+                body='Текст'
+            )
+            for number in range(3)
+        ]
+        settings.EMAIL_BACKEND = 'tests.test_12_outbox.FailingEmailBackend'
+        call_command('send_outbox', once=True)
+        assert [
+            email.attempts for email in OutboxEmail.objects.order_by('pk')
+        ] == [1, 0, 0], (
+            'Проверьте, что после разрыва соединения попытка засчитывается '
+            'только письму, которое пытались отправить.'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        settings.EMAIL_BACKEND = 'tests.test_12_outbox.CrashingEmailBackend'
+        with pytest.raises(RuntimeError):
+            call_command('send_outbox', once=True)
+        emails[0].refresh_from_db()
+        assert emails[0].sent_at is not None, (
+            'Проверьте, что отметка об отправке сохраняется, даже если '
+            'отправка следующего письма завершилась исключением.'
+        )
+
+    def test_04_code_emails_expire(self, client):
+        outbox_before_count = len(mail.outbox)
+        for username in ('sent', 'late'):
+            client.post(self.URL_SIGNUP, data={
+                'email': f'{username}@yamdb.fake', 'username': username
+            })
+        sent, late = OutboxEmail.objects.order_by('pk')
+        assert sent.expires_at is not None, (
+            'Проверьте, что письмо с кодом действует столько же, сколько '
+            'код подтверждения.'
+        )
+        late.expires_at = timezone.now()
+        late.save()
+
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что истёкшие письма с кодом не отправляются.'
+        )
+        sent.refresh_from_db()
+        assert sent.body == '', (
+            'Проверьте, что после отправки код не хранится в тексте письма.'
+        )
+
+        OutboxEmail.objects.update(expires_at=timezone.now())
+        call_command('clear_confirmation_codes', once=True)
+        assert not OutboxEmail.objects.exists(), (
+            'Проверьте, что `clear_confirmation_codes` удаляет истёкшие '
+            'письма с кодами, отправленные или нет.'
+        )
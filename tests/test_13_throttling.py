@@ -0,0 +1,188 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api.shared import SharedCounters, SharedTokenBuckets
+from api import throttling
+from api.throttling import (
+    CommentWriteThrottle,
+    SignUpEmailThrottle,
+    SignUpIPThrottle,
+    TokenUsernameThrottle,
+)
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ThrottlingAPI:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_throttled_per_email(self, client, monkeypatch):
+        monkeypatch.setattr(SignUpEmailThrottle, 'rate', '2/hour')
+        data = {'email': 'flood@yamdb.fake', 'username': 'flood'}
+        for _ in range(2):
+            response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.OK
+
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частые запросы кода на один email отклоняются '
+            'со статусом 429.'
+        )
+        assert int(response.headers['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+        assert throttling.rejections.get('signup_email') == 1, (
+            'Проверьте, что отклонённые запросы учитываются в метриках.'
+        )
+
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'other@yamdb.fake', 'username': 'other'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_token_throttled_per_username(self, client, user,
+                                             monkeypatch):
+        monkeypatch.setattr(TokenUsernameThrottle, 'rate', '1/hour')
+        data = {'username': user.username, 'confirmation_code': '000000'}
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения для одного username '
+            'ограничивается.'
+        )
+
+    def test_03_buckets_shared_between_processes(self):
+        token_buckets = throttling.token_buckets
+        other_worker = SharedTokenBuckets(
+            token_buckets.path, token_buckets.slots
+        )
+        assert other_worker.consume('key', 1, 1 / 3600) == (True, 0)
+        allowed, wait = token_buckets.consume('key', 1, 1 / 3600)
+        assert not allowed, (
+            'Проверьте, что корзины токенов общие для всех процессов.'
+        )
+        assert 0 < wait <= 3600
+
+    def test_04_comment_writes_throttled(self, admin_client, user_client,
+                                         monkeypatch):
+        monkeypatch.setattr(CommentWriteThrottle, 'rate', '2/minute')
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Отзыв', 5
+        ).json()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        for text in ('Первый', 'Второй'):
+            create_single_comment(
+                user_client, titles[0]['id'], review['id'], text
+            )
+
+        response = user_client.post(f'{url}comments/', data={'text': 'Ещё'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частое создание комментариев одним '
+            'пользователем ограничивается.'
+        )
+        assert int(response.headers['Retry-After']) > 0
+        assert throttling.rejections.get('comments_user') == 1
+        assert user_client.get(
+            f'{url}comments/'
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что ограничение не действует на чтение.'
+        )
+
+    def test_05_review_limits_by_role(self, admin_client, user_client,
+                                      settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                'reviews_user': '1/minute',
+                'reviews_admin': None,
+            },
+        }
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(admin_client, title['id'], 'Отзыв', 5)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит на отзывы зависит от роли пользователя.'
+        )
+
+    def test_06_sliding_window(self):
+        rate_windows = throttling.rate_windows
+        assert rate_windows.hit('key', 2, 60) == (True, 0)
+        assert rate_windows.hit('key', 2, 60) == (True, 0)
+        allowed, wait = rate_windows.hit('key', 2, 60)
+        assert not allowed
+        assert 0 < wait <= 120
+
+    def test_07_non_object_body(self, client):
+        for url in (self.URL_SIGNUP, self.URL_TOKEN):
+            response = client.post(
+                url, data=[1, 2], content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос на `{url}` с телом-массивом '
+                'возвращает ответ со статусом 400.'
+            )
+
+    def test_08_zero_rate(self, client, monkeypatch):
+        assert throttling.rate_windows.hit('zero', 0, 60) == (False, 60), (
+            'Проверьте, что нулевой лимит запрещает запросы на целое окно.'
+        )
+        monkeypatch.setattr(SignUpEmailThrottle, 'rate', '0/minute')
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'zero@yamdb.fake', 'username': 'zero'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит `0/minute` отклоняет все запросы.'
+        )
+        assert int(response.headers['Retry-After']) == 60
+
+    def test_09_forwarded_for_ignored(self, client, monkeypatch):
+        monkeypatch.setattr(SignUpIPThrottle, 'rate', '2/hour')
+        statuses = [
+            client.post(
+                self.URL_SIGNUP,
+                data={
+                    'email': f'spoof{number}@yamdb.fake',
+                    'username': f'spoof{number}',
+                },
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что ограничение по IP не обходится подменой '
+            'заголовка `X-Forwarded-For` без доверенного прокси.'
+        )
+
+    def test_10_rejection_stats(self, client, monkeypatch):
+        monkeypatch.setattr(SignUpIPThrottle, 'rate', '0/hour')
+        for _ in range(2):
+            client.post(self.URL_SIGNUP, data={
+                'email': 'stats@yamdb.fake', 'username': 'stats'
+            })
+        rejections = throttling.rejections
+        other_worker = SharedCounters(rejections.path, rejections.slots)
+        assert other_worker.get('signup_ip') == 2, (
+            'Проверьте, что счётчики отказов общие для процессов сервера.'
+        )
+        output = io.StringIO()
+        call_command('throttle_stats', stdout=output)
+        assert 'signup_ip: 2' in output.getvalue().splitlines(), (
+            'Проверьте, что команда `throttle_stats` выводит количество '
+            'отказов по областям ограничений.'
+        )
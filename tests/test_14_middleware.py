@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14MiddlewareAPI:
+
+    API_URL = '/api/v1/categories/'
+    ADMIN_URL = '/admin/login/'
+
+    def test_01_api_skips_browser_middleware(self, client):
+        response = client.get(self.API_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что для запросов к API сессия не загружается.'
+        )
+        assert 'X-Frame-Options' not in response, (
+            'Проверьте, что ответы API обходятся без X-Frame-Options.'
+        )
+
+    def test_02_admin_keeps_full_stack(self, client):
+        response = client.get(self.ADMIN_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что админка по-прежнему работает с сессиями.'
+        )
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies, (
+            'Проверьте, что админка по-прежнему защищена от CSRF.'
+        )
+
+    def test_03_admin_csrf_checked(self, client):
+        client = type(client)(enforce_csrf_checks=True)
+        response = client.post(self.ADMIN_URL, data={})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что для админки проверка CSRF не отключена.'
+        )
+
+    def test_04_async_requests(self):
+        get = async_to_sync(AsyncClient().get)
+        response = get(self.API_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert 'X-Frame-Options' not in response
+        response = get(self.ADMIN_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что middleware работают и в асинхронном режиме.'
+        )
+        assert response['X-Frame-Options'] == 'DENY'
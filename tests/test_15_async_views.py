@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncRequestFactory, override_settings
+
+from api.views import (
+    CategoryViewSet,
+    CommentViewSet,
+    ReviewViewSet,
+    TitleViewSet,
+)
+from tests.utils import (
+    create_single_comment,
+    create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15AsyncViewsAPI:
+
+    def get_response(self, viewset, actions, url, **kwargs):
+        with override_settings(ASYNC_READ_VIEWS=True):
+            view = viewset.as_view(actions)
+        assert iscoroutinefunction(view), (
+            'Проверьте, что при ASYNC_READ_VIEWS представление асинхронное.'
+        )
+        response = async_to_sync(view)(
+            AsyncRequestFactory().get(url), **kwargs
+        )
+        return response.render()
+
+    def test_01_async_lists_match_sync(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Отзыв', 7
+        ).json()
+        create_single_comment(user_client, title_id, review['id'], 'Текст')
+        cases = (
+            (CategoryViewSet, {'get': 'list'}, '/api/v1/categories/', {}),
+            (TitleViewSet, {'get': 'list'}, '/api/v1/titles/', {}),
+            (
+                TitleViewSet, {'get': 'retrieve'},
+                f'/api/v1/titles/{title_id}/', {'pk': str(title_id)}
+            ),
+            (
+                ReviewViewSet, {'get': 'list'},
+                f'/api/v1/titles/{title_id}/reviews/',
+                {'title_id': str(title_id)}
+            ),
+            (
+                CommentViewSet, {'get': 'list'},
+                f'/api/v1/titles/{title_id}/reviews/{review["id"]}/comments/',
+                {'title_id': str(title_id), 'review_id': str(review['id'])}
+            ),
+        )
+        for viewset, actions, url, kwargs in cases:
+            response = self.get_response(viewset, actions, url, **kwargs)
+            assert response.status_code == HTTPStatus.OK
+            assert response.data == client.get(url).json(), (
+                f'Проверьте, что асинхронный ответ на `{url}` совпадает '
+                'с синхронным.'
+            )
+
+    def test_02_async_not_found(self):
+        response = self.get_response(
+            ReviewViewSet, {'get': 'list'},
+            '/api/v1/titles/1/reviews/', title_id='1'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что асинхронный список отзывов несуществующего '
+            'произведения возвращает 404.'
+        )
+        response = self.get_response(
+            TitleViewSet, {'get': 'list'}, '/api/v1/titles/?page=5'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND